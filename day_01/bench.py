@@ -0,0 +1,42 @@
+"""Compares repeated print_part_1_solution calls with one ExpenseIndex.
+
+Run from this directory: python bench.py
+"""
+import contextlib
+import io
+import random
+import time
+
+from main import ExpenseIndex, print_part_1_solution
+
+NUM_INPUTS = 200_000
+NUM_TARGETS = 200
+MAX_VALUE = 1_000_000
+
+
+def main() -> None:
+    rng = random.Random(2020)
+    inputs = [rng.randrange(MAX_VALUE) for _ in range(NUM_INPUTS)]
+    targets = [rng.randrange(MAX_VALUE, 2 * MAX_VALUE) for _ in range(NUM_TARGETS)]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for target in targets:
+            print_part_1_solution(inputs, target=target)
+    repeated_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = ExpenseIndex(inputs)
+    build_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    index.query_batch(targets)
+    query_seconds = time.perf_counter() - start
+
+    print(f"{NUM_INPUTS} entries, {NUM_TARGETS} pair targets")
+    print(f"Repeated print_part_1_solution: {repeated_seconds:.3f}s")
+    print(f"ExpenseIndex build:             {build_seconds:.3f}s")
+    print(f"ExpenseIndex queries:           {query_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
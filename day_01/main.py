@@ -1,4 +1,13 @@
-from typing import List, Iterator, Tuple
+import bisect
+import io
+import math
+import sys
+from typing import Dict, Iterable, List, Iterator, Tuple, Union, cast
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 SAMPLE_INPUTS = [
     1721,
@@ -9,65 +18,335 @@ SAMPLE_INPUTS = [
     1456,
 ]
 
-with open("./input.txt") as f:
-    ACTUAL_INPUTS = [int(line.strip()) for line in f]
 
+def iter_input_ints(file_obj: io.TextIOBase) -> Iterator[int]:
+    for line in file_obj:
+        stripped = line.strip()
+        if stripped:
+            yield int(stripped)
 
-def gen_two_entries_sum_2020(inputs: List[int]) -> Iterator[Tuple[int, int]]:
-    sorted_inputs = sorted(inputs)
-    length = len(sorted_inputs)
-    i = 0
-    while i < length - 2 and sorted_inputs[i] <= 2020 / 2:
-        for j in range(i + 1, length):
-            vi = sorted_inputs[i]
-            vj = sorted_inputs[j]
-            sum_vals = vi + vj
-            if sum_vals == 2020:
-                yield vi, vj
-            elif sum_vals > 2020:
+
+def get_actual_inputs() -> List[int]:
+    with open("./input.txt") as f:
+        return list(iter_input_ints(f))
+
+
+# The counting array is only worth it while scanning it costs about as much as
+# sorting the input would
+COUNTING_ARRAY_FACTOR = 8
+COUNTING_ARRAY_SLACK = 4096
+
+
+def _gen_k_sum_sorted(
+    distinct: List[int],
+    counts: Union[Dict[int, int], List[int]],
+    k: int,
+    target: int,
+    start: int,
+) -> Iterator[Tuple[int, ...]]:
+    """Yields ascending k-tuples drawn from distinct[start:] summing to target.
+
+    counts is either a value -> count dict or, on the bounded fast path, a list
+    indexed by value. It is decremented while a value is in use and restored
+    before moving on, so repeated values are only used as often as they occur.
+    """
+    length = len(distinct)
+    if k == 1:
+        if start < length and target >= distinct[start]:
+            if isinstance(counts, list):
+                available = 0 <= target < len(counts) and counts[target] > 0
+            else:
+                available = counts.get(target, 0) > 0
+            if available:
+                yield (target,)
+        return
+    if k == 2:
+        for i in range(start, length):
+            vi = distinct[i]
+            vj = target - vi
+            if vj < vi:
                 break
-        i += 1
+            if isinstance(counts, list):
+                count_j = counts[vj] if 0 <= vj < len(counts) else 0
+            else:
+                count_j = counts.get(vj, 0)
+            # The same value can only pair with itself if it occurs twice
+            if count_j >= (2 if vj == vi else 1):
+                yield vi, vj
+        return
+    for i in range(start, length):
+        vi = distinct[i]
+        # Everything after vi is at least vi, so the smallest possible sum
+        # only grows from here
+        if vi * k > target:
+            break
+        counts[vi] -= 1
+        next_start = i if counts[vi] > 0 else i + 1
+        for rest in _gen_k_sum_sorted(distinct, counts, k - 1, target - vi, next_start):
+            yield (vi, *rest)
+        counts[vi] += 1
+
+
+def k_sum(inputs: List[int], k: int, target: int) -> Iterator[Tuple[int, ...]]:
+    """Yields each ascending k-tuple of entries summing to target once.
 
+    Pairs take O(n) after sorting the distinct values and triples O(n^2). When
+    every entry lies within [0, target] and the target is small relative to
+    the input, a counting array replaces both the sort and the hash lookups.
+    """
+    if k < 1:
+        raise ValueError(f"k must be positive, got {k}")
+    if not inputs:
+        return
+    counts: Union[Dict[int, int], List[int]]
+    counting_array_size = target + 1
+    if (
+        counting_array_size
+        <= COUNTING_ARRAY_FACTOR * len(inputs) + COUNTING_ARRAY_SLACK
+        and min(inputs) >= 0
+        and max(inputs) <= target
+    ):
+        counts = [0] * counting_array_size
+        for value in inputs:
+            counts[value] += 1
+        distinct = [value for value, count in enumerate(counts) if count]
+    else:
+        counts = {}
+        for value in inputs:
+            counts[value] = counts.get(value, 0) + 1
+        distinct = sorted(counts)
+    yield from _gen_k_sum_sorted(distinct, counts, k, target, 0)
 
-def print_part_1_solution(inputs: List[int]) -> None:
-    for vi, vj in gen_two_entries_sum_2020(inputs):
+
+def _gen_index_combinations(
+    inputs: List[int], k: int, target: int
+) -> Iterator[Tuple[int, ...]]:
+    """Repeats each k_sum tuple once per combination of input indices.
+
+    This keeps the multiplicity of the original nested-loop generators, so
+    [1, 2019, 1, 2019] still yields (1, 2019) four times. Unlike those loops,
+    the final entries are no longer skipped, so [1010, 1010] yields a pair.
+    """
+    counts: Dict[int, int] = {}
+    for value in inputs:
+        counts[value] = counts.get(value, 0) + 1
+    for values in k_sum(inputs, k, target):
+        multiplicity = 1
+        for value in set(values):
+            multiplicity *= math.comb(counts[value], values.count(value))
+        for _ in range(multiplicity):
+            yield values
+
+
+def gen_two_entries_sum_2020(inputs: List[int]) -> Iterator[Tuple[int, int]]:
+    return cast(Iterator[Tuple[int, int]], _gen_index_combinations(inputs, 2, 2020))
+
+
+def print_part_1_solution(inputs: List[int], *, target: int = 2020) -> None:
+    for vi, vj in _gen_index_combinations(inputs, 2, target):
         print(f"{vi} * {vj} = {vi * vj}")
 
 
-def gen_three_entries_sum_2020(inputs: List[int]) -> Iterator[Tuple[int, int]]:
-    sorted_inputs = sorted(inputs)
-    length = len(sorted_inputs)
-    i = 0
-    while i < length - 2 and sorted_inputs[i] <= 2020 / 2:
-        for j in range(i + 1, length):
-            should_break = False
-            for k in range(j + 1, length):
-                vi = sorted_inputs[i]
-                vj = sorted_inputs[j]
-                vk = sorted_inputs[k]
-                sum_vals = vi + vj + vk
-                if sum_vals == 2020:
-                    yield vi, vj, vk
-                elif sum_vals > 2020:
-                    should_break = True
-                    break
-            if should_break:
-                break
-        i += 1
+def gen_three_entries_sum_2020(inputs: List[int]) -> Iterator[Tuple[int, int, int]]:
+    return cast(
+        Iterator[Tuple[int, int, int]], _gen_index_combinations(inputs, 3, 2020)
+    )
+
 
-def print_part_2_solution(inputs: List[int]) -> None:
-    for vi, vj, vk in gen_three_entries_sum_2020(inputs):
+def print_part_2_solution(inputs: List[int], *, target: int = 2020) -> None:
+    for vi, vj, vk in _gen_index_combinations(inputs, 3, target):
         print(f"{vi} * {vj} * {vk} = {vi * vj * vk}")
 
+
+# Upper bound on elements in any intermediate array of the vectorized search
+VECTORIZED_CHUNK_SIZE = 1 << 22
+
+
+def _gen_pairs_vectorized(
+    distinct: "np.ndarray", counts: "np.ndarray", target: int, chunk_size: int
+) -> Iterator[Tuple[int, int]]:
+    length = len(distinct)
+    end = int(np.searchsorted(distinct, target // 2, side="right"))
+    for lo in range(0, end, chunk_size):
+        hi = min(lo + chunk_size, end)
+        vi = distinct[lo:hi]
+        vj = target - vi
+        j = np.searchsorted(distinct, vj)
+        found = (j < length) & (distinct[np.minimum(j, length - 1)] == vj)
+        found &= (vj != vi) | (counts[lo:hi] >= 2)
+        yield from zip(vi[found].tolist(), vj[found].tolist())
+
+
+def _gen_triples_block(
+    distinct: "np.ndarray",
+    counts: "np.ndarray",
+    target: int,
+    rows: Tuple[int, int],
+    cols: Tuple[int, int],
+) -> Iterator[Tuple[int, int, int]]:
+    length = len(distinct)
+    lo, hi = rows
+    col_lo, col_hi = cols
+    vi = distinct[lo:hi, None]
+    ci = counts[lo:hi, None]
+    vj = distinct[None, col_lo:col_hi]
+    cj = counts[None, col_lo:col_hi]
+    vk = target - vi - vj
+    k = np.searchsorted(distinct, vk)
+    found = (k < length) & (distinct[np.minimum(k, length - 1)] == vk)
+    found &= np.arange(lo, hi)[:, None] <= np.arange(col_lo, col_hi)[None, :]
+    found &= vk >= vj
+    # Repeated values must occur in the input at least as often as used
+    found &= ci >= 1 + (vj == vi) + (vk == vi)
+    found &= cj >= 1 + (vk == vj)
+    found_rows, found_cols = np.nonzero(found)
+    yield from zip(
+        vi[found_rows, 0].tolist(),
+        vj[0, found_cols].tolist(),
+        vk[found_rows, found_cols].tolist(),
+    )
+
+
+def _gen_triples_vectorized(
+    distinct: "np.ndarray", counts: "np.ndarray", target: int, chunk_size: int
+) -> Iterator[Tuple[int, int, int]]:
+    row_end = int(np.searchsorted(distinct, target // 3, side="right"))
+    lo = 0
+    while lo < row_end:
+        # Columns start at the first row of the chunk (j >= i) and stop once
+        # vj alone exceeds half of what the smallest row leaves over
+        col_end = int(
+            np.searchsorted(distinct, (target - int(distinct[lo])) // 2, side="right")
+        )
+        width = max(col_end - lo, 1)
+        if width <= chunk_size:
+            hi = min(lo + chunk_size // width, row_end)
+            yield from _gen_triples_block(
+                distinct, counts, target, (lo, hi), (lo, col_end)
+            )
+        else:
+            # A single row is already too wide, so tile its columns instead
+            hi = lo + 1
+            for col_lo in range(lo, col_end, chunk_size):
+                col_hi = min(col_lo + chunk_size, col_end)
+                yield from _gen_triples_block(
+                    distinct, counts, target, (lo, hi), (col_lo, col_hi)
+                )
+        lo = hi
+
+
+_INT64_MAX = (1 << 63) - 1
+
+
+def gen_k_sum_vectorized(
+    inputs: List[int],
+    k: int,
+    target: int,
+    *,
+    chunk_size: int = VECTORIZED_CHUNK_SIZE,
+) -> Iterator[Tuple[int, ...]]:
+    """NumPy searchsorted backend for k_sum with pairs and triples.
+
+    Yields the same tuples in the same order as k_sum. Rows, and columns once
+    a single row gets too wide, are processed in tiles so no intermediate
+    array holds more than chunk_size elements. Falls back to k_sum when NumPy
+    is unavailable, for other values of k, or when the target or a partial
+    sum could overflow 64-bit integers.
+    """
+    if np is None or k not in (2, 3) or not inputs:
+        yield from k_sum(inputs, k, target)
+        return
+    # target - vi - vj is the largest intermediate the search computes
+    largest_entry = max(-min(inputs), max(inputs))
+    if abs(target) + (k - 1) * largest_entry > _INT64_MAX:
+        yield from k_sum(inputs, k, target)
+        return
+    values = np.asarray(inputs, dtype=np.int64)
+    distinct, counts = np.unique(values, return_counts=True)
+    if k == 2:
+        yield from _gen_pairs_vectorized(distinct, counts, target, chunk_size)
+    else:
+        yield from _gen_triples_vectorized(distinct, counts, target, chunk_size)
+
+
+class ExpenseIndex:
+    """Sorts and dedups an expense list once to answer many k-sum queries.
+
+    Each query walks the distinct values starting from the smallest one that
+    could still reach the target, so it never pays for another sort.
+    """
+
+    def __init__(self, inputs: List[int]) -> None:
+        self.counts: Dict[int, int] = {}
+        for value in inputs:
+            self.counts[value] = self.counts.get(value, 0) + 1
+        self.distinct = sorted(self.counts)
+
+    def k_sum(self, k: int, target: int) -> List[Tuple[int, ...]]:
+        if k < 1:
+            raise ValueError(f"k must be positive, got {k}")
+        if not self.distinct:
+            return []
+        # The other k - 1 entries contribute at most this much
+        start = bisect.bisect_left(self.distinct, target - (k - 1) * self.distinct[-1])
+        # Fully consumed so the temporary count decrements are always undone
+        return list(_gen_k_sum_sorted(self.distinct, self.counts, k, target, start))
+
+    def pairs(self, target: int) -> List[Tuple[int, int]]:
+        return cast(List[Tuple[int, int]], self.k_sum(2, target))
+
+    def triples(self, target: int) -> List[Tuple[int, int, int]]:
+        return cast(List[Tuple[int, int, int]], self.k_sum(3, target))
+
+    def query_batch(
+        self, targets: Iterable[int], k: int = 2
+    ) -> Dict[int, List[Tuple[int, ...]]]:
+        return {target: self.k_sum(k, target) for target in targets}
+
+
+def gen_streaming_pairs(
+    values: Iterable[int], target: int
+) -> Iterator[Tuple[int, int]]:
+    """Yields each ascending pair summing to target as soon as it completes.
+
+    Values are consumed one at a time, so a pair is emitted the moment its
+    second member arrives. Only a capped count per distinct value is kept.
+    """
+    # A value is needed at most twice, for pairing with itself
+    seen_counts: Dict[int, int] = {}
+    for value in values:
+        previous_count = seen_counts.get(value, 0)
+        if previous_count >= 2:
+            continue
+        complement = target - value
+        if complement == value:
+            if previous_count == 1:
+                yield value, value
+        elif previous_count == 0 and complement in seen_counts:
+            yield min(value, complement), max(value, complement)
+        seen_counts[value] = previous_count + 1
+
+
+def print_streaming_pairs(file_obj: io.TextIOBase, *, target: int = 2020) -> None:
+    for vi, vj in gen_streaming_pairs(iter_input_ints(file_obj), target):
+        print(f"{vi} * {vj} = {vi * vj}", flush=True)
+
+
 def main() -> None:
+    # python main.py --stream [target] < numbers.txt
+    if sys.argv[1:2] == ["--stream"]:
+        target = int(sys.argv[2]) if len(sys.argv) > 2 else 2020
+        print_streaming_pairs(sys.stdin, target=target)
+        return
+    actual_inputs = get_actual_inputs()
     print("---Samples Part 1---")
     print_part_1_solution(SAMPLE_INPUTS)
     print("---Actual Part 1---")
-    print_part_1_solution(ACTUAL_INPUTS)
+    print_part_1_solution(actual_inputs)
     print("---Samples Part 2---")
     print_part_2_solution(SAMPLE_INPUTS)
     print("---Actual Part 2---")
-    print_part_2_solution(ACTUAL_INPUTS)
+    print_part_2_solution(actual_inputs)
 
 
 if __name__ == "__main__":
@@ -1,8 +1,27 @@
-from typing import NamedTuple, List, Iterator
+import concurrent.futures
+import os
+from array import array
+import re
+import sys
+from typing import (
+    Callable,
+    Dict,
+    Iterable,
+    NamedTuple,
+    List,
+    Iterator,
+    Mapping,
+    Optional,
+    Tuple,
+)
 
 SAMPLE_INPUTS = ["1-3 a: abcde", "1-3 b: cdefg", "2-9 c: ccccccccc"]
-with open("./input.txt") as INPUTS_FILE:
-    ACTUAL_INPUTS = [line.strip() for line in INPUTS_FILE]
+
+
+def get_actual_inputs() -> List[str]:
+    # Read lazily so pool workers importing this module don't load the file
+    with open("./input.txt") as inputs_file:
+        return [line.strip() for line in inputs_file]
 
 
 class PasswordInput(NamedTuple):
@@ -13,7 +32,7 @@ class PasswordInput(NamedTuple):
 
 
 def validate_part_1_password_input(password_input: PasswordInput) -> bool:
-    count = sum(1 for c in password_input.password if c == password_input.char)
+    count = password_input.password.count(password_input.char)
     return count >= password_input.num1 and count <= password_input.num2
 
 
@@ -21,11 +40,11 @@ def validate_part_2_password_input(password_input: PasswordInput) -> bool:
     password = password_input.password
     length = len(password)
     in_first_position = (
-        password_input.num1 <= length
+        0 < password_input.num1 <= length
         and password[password_input.num1 - 1] == password_input.char
     )
     in_second_position = (
-        password_input.num2 <= length
+        0 < password_input.num2 <= length
         and password[password_input.num2 - 1] == password_input.char
     )
     return (
@@ -36,23 +55,18 @@ def validate_part_2_password_input(password_input: PasswordInput) -> bool:
     )
 
 
+PASSWORD_INPUT_REGEX = re.compile(r"^\s*(\d+)\s*-\s*(\d+)\s+(\S)\s*:\s*(\S*)\s*$")
+
+
 def parse_password_input(raw_password_input: str) -> PasswordInput:
-    input_split = raw_password_input.split(":")
-    assert len(input_split) == 2, "Must be colon-separated password spec"
-    [spec, password_unclean] = input_split
-    spec_split = spec.split(" ")
-    assert len(spec_split) == 2, "Left-hand side must be space separated spec"
-    [num_spec, char_unclean] = spec_split
-    char = char_unclean.strip()
-    assert len(char) == 1, "char must be of length 1"
-    num_spec_split = num_spec.split("-")
-    assert len(num_spec_split) == 2, "There must be a max and min number separated by -"
-    [num1_str, num2_str] = num_spec_split
+    match = PASSWORD_INPUT_REGEX.match(raw_password_input)
+    if not match:
+        raise ValueError(f'Error parsing password spec "{raw_password_input}"')
     return PasswordInput(
-        num1=int(num1_str.strip()),
-        num2=int(num2_str.strip()),
-        char=char,
-        password=password_unclean.strip(),
+        num1=int(match.group(1)),
+        num2=int(match.group(2)),
+        char=match.group(3),
+        password=match.group(4),
     )
 
 
@@ -77,6 +91,204 @@ def count_valid_part_2_password_policies(inputs: List[str]) -> int:
     )
 
 
+PasswordPolicy = Callable[[PasswordInput], bool]
+
+PASSWORD_POLICIES: Dict[str, PasswordPolicy] = {
+    "part_1": validate_part_1_password_input,
+    "part_2": validate_part_2_password_input,
+}
+
+
+def count_valid_password_policies(
+    inputs: Iterable[str], policies: Mapping[str, PasswordPolicy] = PASSWORD_POLICIES
+) -> Dict[str, int]:
+    """Parses each line once and counts the lines passing each policy"""
+    counts = {name: 0 for name in policies}
+    named_policies = list(policies.items())
+    match_line = PASSWORD_INPUT_REGEX.match
+    for line in inputs:
+        match = match_line(line)
+        if not match:
+            if not line.strip():
+                continue
+            raise ValueError(f'Error parsing password spec "{line}"')
+        password_input = PasswordInput(
+            int(match.group(1)), int(match.group(2)), match.group(3), match.group(4)
+        )
+        for name, policy in named_policies:
+            if policy(password_input):
+                counts[name] += 1
+    return counts
+
+
+class PasswordColumns:
+    """Column-oriented storage for parsed password specs.
+
+    num1/num2 live in array("H") columns, the policy characters in one bytes
+    column and all passwords in a single shared buffer addressed by offsets.
+    Passwords and policy characters must be ASCII, and both numbers must fit
+    in an unsigned 16-bit integer.
+    """
+
+    def __init__(self) -> None:
+        self.num1 = array("H")
+        self.num2 = array("H")
+        self.chars = bytearray()
+        self.passwords = bytearray()
+        # Password i occupies passwords[offsets[i]:offsets[i + 1]]
+        self.offsets = array("Q", [0])
+
+    @classmethod
+    def from_lines(cls, inputs: Iterable[str]) -> "PasswordColumns":
+        columns = cls()
+        match_line = PASSWORD_INPUT_REGEX.match
+        for line in inputs:
+            match = match_line(line)
+            if not match:
+                if not line.strip():
+                    continue
+                raise ValueError(f'Error parsing password spec "{line}"')
+            columns._append_fields(
+                int(match.group(1)),
+                int(match.group(2)),
+                match.group(3).encode("ascii"),
+                match.group(4).encode("ascii"),
+            )
+        return columns
+
+    def _append_fields(
+        self, num1: int, num2: int, char: bytes, password: bytes
+    ) -> None:
+        self.num1.append(num1)
+        self.num2.append(num2)
+        self.chars += char
+        self.passwords += password
+        self.offsets.append(len(self.passwords))
+
+    def append(self, password_input: PasswordInput) -> None:
+        self._append_fields(
+            password_input.num1,
+            password_input.num2,
+            password_input.char.encode("ascii"),
+            password_input.password.encode("ascii"),
+        )
+
+    def __len__(self) -> int:
+        return len(self.num1)
+
+    def __getitem__(self, index: int) -> PasswordInput:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("PasswordColumns index out of range")
+        return PasswordInput(
+            num1=self.num1[index],
+            num2=self.num2[index],
+            char=chr(self.chars[index]),
+            password=self.passwords[
+                self.offsets[index] : self.offsets[index + 1]
+            ].decode("ascii"),
+        )
+
+    def __iter__(self) -> Iterator[PasswordInput]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def count_valid_part_1(self) -> int:
+        passwords = self.passwords
+        offsets = self.offsets
+        total = 0
+        for i, (num1, num2, char) in enumerate(zip(self.num1, self.num2, self.chars)):
+            # Counting in place avoids slicing out each password
+            count = passwords.count(char, offsets[i], offsets[i + 1])
+            if num1 <= count <= num2:
+                total += 1
+        return total
+
+    def count_valid_part_2(self) -> int:
+        passwords = self.passwords
+        offsets = self.offsets
+        total = 0
+        for i, (num1, num2, char) in enumerate(zip(self.num1, self.num2, self.chars)):
+            start = offsets[i]
+            length = offsets[i + 1] - start
+            in_first_position = (
+                0 < num1 <= length and passwords[start + num1 - 1] == char
+            )
+            in_second_position = (
+                0 < num2 <= length and passwords[start + num2 - 1] == char
+            )
+            if in_first_position != in_second_position:
+                total += 1
+        return total
+
+
+def split_file_ranges(path: str, num_ranges: int) -> List[Tuple[int, int]]:
+    """Splits a file into up to num_ranges byte ranges that end on newlines"""
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for i in range(1, num_ranges):
+            approximate = size * i // num_ranges
+            if approximate <= boundaries[-1]:
+                continue
+            # Starting one byte early keeps a range that already begins on a
+            # line start from skipping that line
+            f.seek(approximate - 1)
+            f.readline()
+            boundary = f.tell()
+            if boundary >= size:
+                break
+            boundaries.append(boundary)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def iter_range_lines(path: str, start: int, end: int) -> Iterator[str]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode()
+
+
+def _count_valid_in_range(
+    path: str, start: int, end: int, policies: Mapping[str, PasswordPolicy]
+) -> Dict[str, int]:
+    return count_valid_password_policies(iter_range_lines(path, start, end), policies)
+
+
+def count_valid_password_policies_parallel(
+    path: str,
+    policies: Mapping[str, PasswordPolicy] = PASSWORD_POLICIES,
+    *,
+    processes: Optional[int] = None,
+    ranges_per_process: int = 4,
+) -> Dict[str, int]:
+    """Counts valid passwords in a file across a process pool.
+
+    Each worker opens the file itself and reads only its own newline-aligned
+    byte range; only the range bounds and the per-range counts are pickled.
+    Policies must be picklable, i.e. module-level functions.
+    """
+    num_processes = processes or os.cpu_count() or 1
+    ranges = split_file_ranges(path, num_processes * ranges_per_process)
+    counts = {name: 0 for name in policies}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_processes) as executor:
+        futures = [
+            executor.submit(_count_valid_in_range, path, start, end, dict(policies))
+            for start, end in ranges
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            for name, count in future.result().items():
+                counts[name] += count
+    return counts
+
+
 def print_part_1_solution(inputs: List[str]) -> None:
     print(f"{count_valid_part_1_password_policies(inputs)} valid passwords")
 
@@ -86,14 +298,21 @@ def print_part_2_solution(inputs: List[str]) -> None:
 
 
 def main() -> None:
+    sample_counts = count_valid_password_policies(SAMPLE_INPUTS)
+    # python main.py --parallel [path]
+    if sys.argv[1:2] == ["--parallel"]:
+        path = sys.argv[2] if len(sys.argv) > 2 else "./input.txt"
+        actual_counts = count_valid_password_policies_parallel(path)
+    else:
+        actual_counts = count_valid_password_policies(get_actual_inputs())
     print("---Sample Part 1---")
-    print_part_1_solution(SAMPLE_INPUTS)
+    print(f"{sample_counts['part_1']} valid passwords")
     print("---Actual Part 1---")
-    print_part_1_solution(ACTUAL_INPUTS)
+    print(f"{actual_counts['part_1']} valid passwords")
     print("---Sample Part 2---")
-    print_part_2_solution(SAMPLE_INPUTS)
+    print(f"{sample_counts['part_2']} valid passwords")
     print("---Actual Part 2---")
-    print_part_2_solution(ACTUAL_INPUTS)
+    print(f"{actual_counts['part_2']} valid passwords")
 
 
 if __name__ == "__main__":
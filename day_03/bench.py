@@ -0,0 +1,51 @@
+"""Compares BitGrid.sweep with calling general_solution for every slope.
+
+Run from this directory: python bench.py
+"""
+import random
+import time
+
+from main import BitGrid, general_solution, input_str_to_rows, np
+
+NUM_ROWS = 10_000
+WIDTH = 31
+MAX_RIGHT = 50
+MAX_DOWN = 50
+
+
+def main() -> None:
+    rng = random.Random(2020)
+    input_str = "\n".join(
+        "".join(rng.choice("..#") for _ in range(WIDTH)) for _ in range(NUM_ROWS)
+    )
+
+    start = time.perf_counter()
+    rows = input_str_to_rows(input_str)
+    naive_counts = [
+        [
+            general_solution(rows, right=right, down=down)
+            for down in range(1, MAX_DOWN + 1)
+        ]
+        for right in range(1, MAX_RIGHT + 1)
+    ]
+    naive_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    grid = BitGrid.from_str(input_str)
+    sweep_counts = grid.sweep(MAX_RIGHT, MAX_DOWN)
+    sweep_seconds = time.perf_counter() - start
+    assert sweep_counts == naive_counts
+
+    print(f"{NUM_ROWS} rows, R={MAX_RIGHT}, D={MAX_DOWN}")
+    print(f"general_solution per slope: {naive_seconds:.3f}s")
+    print(f"BitGrid.sweep:              {sweep_seconds:.3f}s")
+    if np is not None:
+        start = time.perf_counter()
+        vectorized_counts = grid.sweep(MAX_RIGHT, MAX_DOWN, vectorized=True)
+        vectorized_seconds = time.perf_counter() - start
+        assert vectorized_counts == naive_counts
+        print(f"BitGrid.sweep vectorized:   {vectorized_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
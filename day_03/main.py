@@ -1,5 +1,14 @@
 import enum
-from typing import List
+import functools
+import math
+import mmap
+import operator
+from typing import Iterable, List, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
 
 
 SAMPLE_INPUTS = """
@@ -16,8 +25,7 @@ SAMPLE_INPUTS = """
 .#..#...#.#.#..#...#.#.#..#...#.#.#..#...#.#.#..#...#.#.#..#...#.#
 """
 
-with open("./input.txt") as f:
-    ACTUAL_INPUTS = f.read()
+ACTUAL_INPUTS_PATH = "./input.txt"
 
 
 class Square(enum.Enum):
@@ -45,7 +53,7 @@ def general_solution(rows: List[List[Square]], *, right: int, down: int) -> int:
     row_index = 0
     col_index = 0
     num_trees = 0
-    while row_index < len(rows) - 1:
+    while row_index + down < len(rows):
         row_index += down
         col_index += right
         row = rows[row_index]
@@ -56,31 +64,206 @@ def general_solution(rows: List[List[Square]], *, right: int, down: int) -> int:
     return num_trees
 
 
+PART_2_SLOPES = [(1, 1), (3, 1), (5, 1), (7, 1), (1, 2)]
+
+_ROW_TO_BITS = str.maketrans({"#": "1", ".": "0"})
+
+
+def row_str_to_bitmap(raw_row_str: str) -> int:
+    """Packs a row into an int where bit i is set when column i holds a tree"""
+    row_str = raw_row_str.strip()
+    unknown = row_str.strip(".#")
+    if unknown:
+        raise ValueError(f"Unknown character {unknown[0]}")
+    if not row_str:
+        return 0
+    # Reversed so column 0 lands on the lowest bit
+    return int(row_str.translate(_ROW_TO_BITS)[::-1], 2)
+
+
+class BitGrid:
+    """Toboggan map stored as one int bitmap per row"""
+
+    def __init__(self, rows: List[int], width: int) -> None:
+        self.rows = rows
+        self.width = width
+
+    @classmethod
+    def from_str(cls, input_str: str) -> "BitGrid":
+        raw_rows = input_str.strip().split("\n")
+        width = len(raw_rows[0].strip())
+        return cls([row_str_to_bitmap(raw_row) for raw_row in raw_rows], width)
+
+    def is_tree(self, row_index: int, col_index: int) -> bool:
+        return bool(self.rows[row_index] >> (col_index % self.width) & 1)
+
+    def count_trees(self, slopes: Iterable[Tuple[int, int]]) -> List[int]:
+        """Counts trees hit on each (right, down) slope in one pass over the rows"""
+        slope_list = list(slopes)
+        counts = [0] * len(slope_list)
+        width = self.width
+        for row_index in range(1, len(self.rows)):
+            row = self.rows[row_index]
+            for slope_index, (right, down) in enumerate(slope_list):
+                if row_index % down == 0:
+                    col_index = (row_index // down * right) % width
+                    counts[slope_index] += row >> col_index & 1
+        return counts
+
+    def sweep(
+        self, max_right: int, max_down: int, *, vectorized: bool = False
+    ) -> List[List[int]]:
+        """Counts trees for every slope with right in 1..max_right and down in
+        1..max_down, returned as counts[right - 1][down - 1].
+
+        A slope's column on its n-th step only depends on n * right modulo the
+        width, so the column offsets for all rights are computed once per step
+        residue and shared across every down and every row. vectorized uses
+        NumPy when it is installed.
+        """
+        if vectorized and np is not None:
+            return self._sweep_vectorized(max_right, max_down)
+        width = self.width
+        rights = range(1, max_right + 1)
+        column_cycles = [
+            [step * right % width for right in rights] for step in range(width)
+        ]
+        counts_by_down = [[0] * max_right for _ in range(max_down)]
+        for row_index in range(1, len(self.rows)):
+            row = self.rows[row_index]
+            if not row:
+                continue
+            row_bits = [row >> col_index & 1 for col_index in range(width)]
+            for down in range(1, min(max_down, row_index) + 1):
+                if row_index % down == 0:
+                    columns = column_cycles[row_index // down % width]
+                    counts_by_down[down - 1] = list(
+                        map(
+                            operator.add,
+                            counts_by_down[down - 1],
+                            map(row_bits.__getitem__, columns),
+                        )
+                    )
+        return [list(counts) for counts in zip(*counts_by_down)]
+
+    def _sweep_vectorized(self, max_right: int, max_down: int) -> List[List[int]]:
+        width = self.width
+        bits = np.array(
+            [[row >> col_index & 1 for col_index in range(width)] for row in self.rows],
+            dtype=np.uint8,
+        )
+        rights = np.arange(1, max_right + 1)
+        counts = np.zeros((max_right, max_down), dtype=np.int64)
+        for down in range(1, max_down + 1):
+            visited = bits[down::down]
+            steps = np.arange(1, len(visited) + 1)
+            columns = steps[:, None] * rights[None, :] % width
+            hits = visited[np.arange(len(visited))[:, None], columns]
+            counts[:, down - 1] = hits.sum(axis=0)
+        return counts.tolist()
+
+
+_TREE_BYTE = ord("#")
+_EMPTY_BYTE = ord(".")
+
+
+class MappedGrid:
+    """Toboggan map read in place from a memory-mapped file.
+
+    Every line must have the same width, so a square's byte offset follows
+    directly from its row and column. Only the bytes a slope lands on are
+    ever read; rows no slope visits are never touched.
+    """
+
+    def __init__(self, path: str) -> None:
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty")
+        first_newline = self._map.find(b"\n")
+        if first_newline == -1:
+            self.stride = len(self._map) + 1
+            self.width = len(self._map)
+        else:
+            self.stride = first_newline + 1
+            self.width = first_newline
+            if self._map[first_newline - 1 : first_newline] == b"\r":
+                self.width -= 1
+        if self.width == 0:
+            self.close()
+            raise ValueError(f"{path} starts with an empty line")
+        # The last line may or may not end with a newline, so count rows up
+        # to the end of its content
+        content_len = len(self._map)
+        if self._map[-2:] == b"\r\n":
+            content_len -= 2
+        elif self._map[-1:] == b"\n":
+            content_len -= 1
+        self.num_rows = -(-content_len // self.stride)
+
+    def close(self) -> None:
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self) -> "MappedGrid":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _square_byte(self, row_index: int, col_index: int) -> int:
+        byte = self._map[row_index * self.stride + col_index % self.width]
+        if byte == _TREE_BYTE:
+            return 1
+        elif byte == _EMPTY_BYTE:
+            return 0
+        raise ValueError(f"Unknown character {chr(byte)} in row {row_index}")
+
+    def is_tree(self, row_index: int, col_index: int) -> bool:
+        return bool(self._square_byte(row_index, col_index))
+
+    def count_trees(self, slopes: Iterable[Tuple[int, int]]) -> List[int]:
+        """Counts trees hit on each (right, down) slope in one pass over the rows"""
+        slope_list = list(slopes)
+        counts = [0] * len(slope_list)
+        if not slope_list:
+            return counts
+        # Rows that aren't a multiple of every slope's down are skipped outright
+        row_step = functools.reduce(math.gcd, (down for _, down in slope_list))
+        for row_index in range(row_step, self.num_rows, row_step):
+            for slope_index, (right, down) in enumerate(slope_list):
+                if row_index % down == 0:
+                    col_index = row_index // down * right
+                    counts[slope_index] += self._square_byte(row_index, col_index)
+        return counts
+
+
 def part1_solution(input_str: str) -> int:
-    rows = input_str_to_rows(input_str)
-    return general_solution(rows, right=3, down=1)
+    grid = BitGrid.from_str(input_str)
+    [num_trees] = grid.count_trees([(3, 1)])
+    return num_trees
 
 
 def part2_solution(input_str: str) -> int:
-    rows = input_str_to_rows(input_str)
-    return (
-        general_solution(rows, right=1, down=1)
-        * general_solution(rows, right=3, down=1)
-        * general_solution(rows, right=5, down=1)
-        * general_solution(rows, right=7, down=1)
-        * general_solution(rows, right=1, down=2)
-    )
+    grid = BitGrid.from_str(input_str)
+    return math.prod(grid.count_trees(PART_2_SLOPES))
 
 
 def main() -> None:
     print("---Sample Part 1---")
     print(f"{part1_solution(SAMPLE_INPUTS)} trees encountered")
     print("---Actual Part 1---")
-    print(f"{part1_solution(ACTUAL_INPUTS)} trees encountered")
+    with MappedGrid(ACTUAL_INPUTS_PATH) as grid:
+        [num_trees] = grid.count_trees([(3, 1)])
+    print(f"{num_trees} trees encountered")
     print("---Sample Part 2---")
     print(f"{part2_solution(SAMPLE_INPUTS)} trees encountered")
     print("---Actual Part 2---")
-    print(f"{part2_solution(ACTUAL_INPUTS)} trees encountered")
+    with MappedGrid(ACTUAL_INPUTS_PATH) as grid:
+        num_trees_product = math.prod(grid.count_trees(PART_2_SLOPES))
+    print(f"{num_trees_product} trees encountered")
 
 
 if __name__ == "__main__":
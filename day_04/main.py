@@ -1,6 +1,22 @@
+import concurrent.futures
 import io
+import os
 import re
-from typing import NamedTuple, Iterable, Optional, Dict
+import sys
+import time
+from typing import (
+    AbstractSet,
+    Callable,
+    Collection,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Tuple,
+)
 
 _SAMPLE_INPUT_STR = """ecl:gry pid:860033327 eyr:2020 hcl:#fffffd
 byr:1937 iyr:2017 cid:147 hgt:183cm
@@ -19,107 +35,361 @@ iyr:2011 ecl:brn hgt:59in"""
 SAMPLE_INPUTS = io.StringIO(_SAMPLE_INPUT_STR)
 
 
-def convert_line_to_kvs_dict(line: str) -> Dict[str, str]:
-    output: Dict[str, str] = {}
-    for kv_raw in line.strip().split(" "):
-        kv = kv_raw.strip()
-        if kv:
-            kv_split = kv.split(":")
-            assert len(kv_split) == 2, f"{kv} must be a colon-separated pair"
-            key = kv_split[0].strip()
-            value = kv_split[1].strip()
-            output[key] = value
-    return output
+PASSPORT_FIELD_REGEX = re.compile(r"([^\s:]+):(\S*)")
 
+PASSPORT_REQUIRED_FIELDS = frozenset({"byr", "iyr", "eyr", "hgt", "hcl", "ecl", "pid"})
 
-def iter_passports(file_obj: io.TextIOBase) -> Iterable[Dict[str, str]]:
-    """Note that in this implementation, the file should not start with any blank lines"""
+
+def iter_passports(
+    file_obj: Iterable[str], fields: Optional[AbstractSet[str]] = None
+) -> Iterable[Dict[str, str]]:
+    """Yields each blank-line-separated passport as a dict.
+
+    Fields are added to the current record in place, so records spanning many
+    lines stay linear. When fields is given, only those keys are kept.
+    """
+    find_fields = PASSPORT_FIELD_REGEX.findall
     current_kvs: Dict[str, str] = {}
-    for raw_line in file_obj:
-        line = raw_line.strip()
-        if line:
-            current_kvs = {
-                **current_kvs,
-                **convert_line_to_kvs_dict(line),
-            }
-        elif current_kvs:
+    in_record = False
+    for line in file_obj:
+        if line.strip():
+            in_record = True
+            if fields is None:
+                current_kvs.update(find_fields(line))
+            else:
+                for key, value in find_fields(line):
+                    if key in fields:
+                        current_kvs[key] = value
+        elif in_record:
             yield current_kvs
             current_kvs = {}
-    if current_kvs:
+            in_record = False
+    if in_record:
         yield current_kvs
 
 
 def validate_passport_part_1(passport: Dict[str, str]) -> bool:
-    return (
-        "byr" in passport
-        and "iyr" in passport
-        and "eyr" in passport
-        and "hgt" in passport
-        and "hcl" in passport
-        and "ecl" in passport
-        and "pid" in passport
-    )
+    return PASSPORT_REQUIRED_FIELDS <= passport.keys()
+
+class PassportRule(NamedTuple):
+    """One declarative check on a passport field.
+
+    kind is one of:
+    - "range": value fully matches pattern and low <= int(value) <= high
+    - "units": value is a number matching pattern followed by one of the
+      units keys, and the number lies within that unit's (low, high)
+    - "pattern": value fully matches pattern
+    - "choice": value is one of choices
+    A missing field always fails its rule.
+    """
+
+    field: str
+    kind: str
+    pattern: Optional[str] = None
+    low: Optional[int] = None
+    high: Optional[int] = None
+    units: Optional[Mapping[str, Tuple[int, int]]] = None
+    choices: Optional[Collection[str]] = None
+
+
+PART_2_RULES = [
+    PassportRule("byr", "range", pattern=r"[1-2][0-9]{3}", low=1920, high=2002),
+    PassportRule("iyr", "range", pattern=r"[1-2][0-9]{3}", low=2010, high=2020),
+    PassportRule("eyr", "range", pattern=r"[1-2][0-9]{3}", low=2020, high=2030),
+    PassportRule(
+        "hgt", "units", pattern=r"[1-9][0-9]*", units={"cm": (150, 193), "in": (59, 76)}
+    ),
+    PassportRule("hcl", "pattern", pattern=r"#[0-9a-zA-Z]{6}"),
+    PassportRule(
+        "ecl", "choice", choices=("amb", "blu", "brn", "gry", "grn", "hzl", "oth")
+    ),
+    PassportRule("pid", "pattern", pattern=r"[0-9]{9}"),
+]
+
+
+def compile_passport_rule(rule: PassportRule) -> Callable[[Optional[str]], bool]:
+    if rule.kind == "range":
+        fullmatch = re.compile(rule.pattern or r"[0-9]+").fullmatch
+        low, high = rule.low, rule.high
+
+        def check(value: Optional[str]) -> bool:
+            return (
+                value is not None
+                and fullmatch(value) is not None
+                and (low is None or int(value) >= low)
+                and (high is None or int(value) <= high)
+            )
+
+    elif rule.kind == "units":
+        if not rule.units:
+            raise ValueError(f'Rule for "{rule.field}" needs units')
+        units = {unit: tuple(bounds) for unit, bounds in rule.units.items()}
+        unit_options = "|".join(re.escape(unit) for unit in units)
+        fullmatch = re.compile(
+            f"({rule.pattern or '[0-9]+'})({unit_options})"
+        ).fullmatch
+
+        def check(value: Optional[str]) -> bool:
+            match = fullmatch(value) if value is not None else None
+            if match is None:
+                return False
+            low, high = units[match.group(2)]
+            return low <= int(match.group(1)) <= high
+
+    elif rule.kind == "pattern":
+        if rule.pattern is None:
+            raise ValueError(f'Rule for "{rule.field}" needs a pattern')
+        fullmatch = re.compile(rule.pattern).fullmatch
+
+        def check(value: Optional[str]) -> bool:
+            return value is not None and fullmatch(value) is not None
+
+    elif rule.kind == "choice":
+        choices = frozenset(rule.choices or ())
+
+        def check(value: Optional[str]) -> bool:
+            return value in choices
 
-def validate_passport_part_2(passport: Dict[str, str]) -> bool:
-    if not validate_passport_part_1(passport):
-        return False
-    byr = passport["byr"]
-    iyr = passport["iyr"]
-    eyr = passport["eyr"]
-    year_regex = re.compile(r"^[1-2][0-9]{3}$")
-    if (
-        not year_regex.match(byr)
-        or not year_regex.match(iyr)
-        or not year_regex.match(eyr)
-    ):
-        return False
-    byr_int = int(byr)
-    iyr_int = int(iyr)
-    eyr_int = int(eyr)
-    if byr_int < 1920 or byr_int > 2002:
-        return False
-    if iyr_int < 2010 or iyr_int > 2020:
-        return False
-    if eyr_int < 2020 or eyr_int > 2030:
-        return False
-    hgt = passport["hgt"]
-    hgt_regex_cm = re.compile(r"^[1-9][0-9]*cm$")
-    hgt_regex_in = re.compile(r"^[1-9][0-9]*in$")
-    if hgt_regex_cm.match(hgt):
-        hgt_int = int(hgt.rstrip("cm"))
-        if hgt_int < 150 or hgt_int > 193:
-            return False
-    elif hgt_regex_in.match(hgt):
-        hgt_int = int(hgt.rstrip("in"))
-        if hgt_int < 59 or hgt_int > 76:
-            return False
     else:
-        return False
-    hcl = passport["hcl"]
-    hcl_regex = re.compile(r"^#[0-9a-zA-Z]{6}$")
-    if not hcl_regex.match(hcl):
-        return False
-    ecl = passport["ecl"]
-    valid_ecls = {"amb", "blu", "brn", "gry", "grn", "hzl", "oth"}
-    if ecl not in valid_ecls:
-        return False
-    pid = passport["pid"]
-    pid_regex = re.compile(r"^[0-9]{9}$")
-    return pid_regex.match(pid)
+        raise ValueError(f"Unknown rule kind {rule.kind}")
+    return check
+
+
+class RuleStats(NamedTuple):
+    rule: PassportRule
+    evaluated: int
+    rejected: int
+
+    @property
+    def rejection_rate(self) -> float:
+        return self.rejected / self.evaluated if self.evaluated else 0.0
+
+
+class PassportValidator:
+    """Validator compiled once from a list of PassportRules.
+
+    It counts how often each rule runs and rejects. Every reorder_interval
+    passports the checks are re-sorted so the rules that reject most often
+    run first. fields holds every field the rules read, which is all a
+    passport needs to keep.
+    """
+
+    def __init__(
+        self, rules: Iterable[PassportRule], *, reorder_interval: int = 256
+    ) -> None:
+        self.rules = list(rules)
+        self.fields = frozenset(rule.field for rule in self.rules)
+        self.reorder_interval = reorder_interval
+        self.evaluated = [0] * len(self.rules)
+        self.rejected = [0] * len(self.rules)
+        self._order = [
+            (index, rule.field, compile_passport_rule(rule))
+            for index, rule in enumerate(self.rules)
+        ]
+        self._until_reorder = reorder_interval
+
+    def __call__(self, passport: Dict[str, str]) -> bool:
+        self._until_reorder -= 1
+        if self._until_reorder <= 0:
+            self.reorder()
+        evaluated = self.evaluated
+        for index, field, check in self._order:
+            evaluated[index] += 1
+            if not check(passport.get(field)):
+                self.rejected[index] += 1
+                return False
+        return True
+
+    def reorder(self) -> None:
+        # Swap in a new list so a call iterating the old order still sees
+        # every check
+        self._order = sorted(
+            self._order,
+            key=lambda entry: self.stats_for(entry[0]).rejection_rate,
+            reverse=True,
+        )
+        self._until_reorder = self.reorder_interval
+
+    def stats_for(self, index: int) -> RuleStats:
+        return RuleStats(self.rules[index], self.evaluated[index], self.rejected[index])
+
+    def stats(self) -> List[RuleStats]:
+        """Per-rule statistics in the order the checks currently run"""
+        return [self.stats_for(index) for index, _, _ in self._order]
+
+
+_PART_2_CHECKS = tuple(
+    (rule.field, compile_passport_rule(rule)) for rule in PART_2_RULES
+)
+
+
+def validate_passport_part_2(passport: Dict[str, str]) -> bool:
+    """Checks a passport against PART_2_RULES in a fixed order.
+
+    Keeps no state; build a PassportValidator for rule stats and adaptive
+    check ordering.
+    """
+    return all(check(passport.get(field)) for field, check in _PART_2_CHECKS)
 
 
 def solution_part1(file_obj: io.TextIOBase) -> int:
     return sum(
-        1 for passport in iter_passports(file_obj) if validate_passport_part_1(passport)
+        1
+        for passport in iter_passports(file_obj, PASSPORT_REQUIRED_FIELDS)
+        if validate_passport_part_1(passport)
     )
 
 def solution_part2(file_obj: io.TextIOBase) -> int:
+    validator = PassportValidator(PART_2_RULES)
     return sum(
-        1 for passport in iter_passports(file_obj) if validate_passport_part_2(passport)
+        1
+        for passport in iter_passports(file_obj, validator.fields)
+        if validator(passport)
+    )
+
+
+def split_file_records(path: str, num_ranges: int) -> List[Tuple[int, int]]:
+    """Splits a file into up to num_ranges byte ranges that each end right
+    after a blank line, so no passport straddles two ranges"""
+    size = os.path.getsize(path)
+    boundaries = [0]
+    with open(path, "rb") as f:
+        for i in range(1, num_ranges):
+            approximate = size * i // num_ranges
+            if approximate <= boundaries[-1]:
+                continue
+            # Align to the start of a line, then advance past the next blank one
+            f.seek(approximate - 1)
+            f.readline()
+            for line in iter(f.readline, b""):
+                if not line.strip():
+                    break
+            boundary = f.tell()
+            if boundary >= size:
+                break
+            boundaries.append(boundary)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def iter_range_lines(path: str, start: int, end: int) -> Iterator[str]:
+    with open(path, "rb") as f:
+        f.seek(start)
+        position = start
+        while position < end:
+            line = f.readline()
+            if not line:
+                break
+            position += len(line)
+            yield line.decode()
+
+
+class RangeResult(NamedTuple):
+    pid: int
+    valid_part1: int
+    valid_part2: int
+    num_passports: int
+    num_bytes: int
+    seconds: float
+
+
+def _solve_range(path: str, start: int, end: int) -> RangeResult:
+    started = time.perf_counter()
+    validator = PassportValidator(PART_2_RULES)
+    valid_part1 = 0
+    valid_part2 = 0
+    num_passports = 0
+    lines = iter_range_lines(path, start, end)
+    for passport in iter_passports(lines, PASSPORT_REQUIRED_FIELDS | validator.fields):
+        num_passports += 1
+        if validate_passport_part_1(passport):
+            valid_part1 += 1
+        if validator(passport):
+            valid_part2 += 1
+    return RangeResult(
+        pid=os.getpid(),
+        valid_part1=valid_part1,
+        valid_part2=valid_part2,
+        num_passports=num_passports,
+        num_bytes=end - start,
+        seconds=time.perf_counter() - started,
+    )
+
+
+class WorkerThroughput(NamedTuple):
+    pid: int
+    num_ranges: int
+    num_passports: int
+    num_bytes: int
+    seconds: float
+
+    @property
+    def passports_per_second(self) -> float:
+        return self.num_passports / self.seconds if self.seconds else 0.0
+
+    @property
+    def bytes_per_second(self) -> float:
+        return self.num_bytes / self.seconds if self.seconds else 0.0
+
+
+class ParallelSolution(NamedTuple):
+    valid_part1: int
+    valid_part2: int
+    workers: List[WorkerThroughput]
+
+
+def solve_parallel(
+    path: str, *, processes: Optional[int] = None, ranges_per_process: int = 4
+) -> ParallelSolution:
+    """Counts valid passports for both parts across a process pool.
+
+    Workers read their own record-aligned byte ranges straight from the file.
+    Each worker's busy time and volume are reported for sizing the pool.
+    """
+    num_processes = processes or os.cpu_count() or 1
+    ranges = split_file_records(path, num_processes * ranges_per_process)
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_processes) as executor:
+        futures = [
+            executor.submit(_solve_range, path, start, end) for start, end in ranges
+        ]
+        results = [future.result() for future in futures]
+    by_pid: Dict[int, List[RangeResult]] = {}
+    for result in results:
+        by_pid.setdefault(result.pid, []).append(result)
+    workers = [
+        WorkerThroughput(
+            pid=pid,
+            num_ranges=len(pid_results),
+            num_passports=sum(result.num_passports for result in pid_results),
+            num_bytes=sum(result.num_bytes for result in pid_results),
+            seconds=sum(result.seconds for result in pid_results),
+        )
+        for pid, pid_results in by_pid.items()
+    ]
+    return ParallelSolution(
+        valid_part1=sum(result.valid_part1 for result in results),
+        valid_part2=sum(result.valid_part2 for result in results),
+        workers=workers,
     )
 
 
+def print_parallel_solution(path: str) -> None:
+    solution = solve_parallel(path)
+    print(f"Part 1: {solution.valid_part1} valid passports")
+    print(f"Part 2: {solution.valid_part2} valid passports")
+    for worker in solution.workers:
+        print(
+            f"Worker {worker.pid}: {worker.num_ranges} ranges, "
+            f"{worker.passports_per_second:.0f} passports/s, "
+            f"{worker.bytes_per_second / 1e6:.2f} MB/s"
+        )
+
+
 def main():
+    # python main.py --parallel [path]
+    if sys.argv[1:2] == ["--parallel"]:
+        print_parallel_solution(sys.argv[2] if len(sys.argv) > 2 else "./input.txt")
+        return
     print("---Sample Part 1---")
     print(f"{solution_part1(SAMPLE_INPUTS)} valid passports")
     print("---Actual Part 1---")
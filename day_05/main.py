@@ -1,6 +1,8 @@
+import functools
 import io
 import re
-from typing import NamedTuple, List, Optional, Iterable
+from array import array
+from typing import Iterator, NamedTuple, List, Optional, Iterable, Tuple, Union
 
 
 class BoardingPass(NamedTuple):
@@ -9,42 +11,61 @@ class BoardingPass(NamedTuple):
     seat_id: int
 
 
-def binary_search_from_top_codes(
-    top_code_list: List[bool], min_value: int, max_value: int
-) -> int:
-    if len(top_code_list) == 0:
-        assert min_value == max_value, f"{min_value} should equal {max_value}"
-        return min_value
-    next_is_top = top_code_list[0]
-    next_top_code_list = top_code_list[1:]
-    num_values = max_value - min_value + 1
-    new_num_values = num_values // 2
-    if next_is_top:
-        return binary_search_from_top_codes(
-            next_top_code_list,
-            min_value=min_value,
-            max_value=min_value + new_num_values - 1,
-        )
-    return binary_search_from_top_codes(
-        next_top_code_list, min_value=min_value + new_num_values, max_value=max_value
-    )
+BP_REGEX = re.compile(r"^[BF]{7}[LR]{3}$")
 
 
-BP_REGEX = re.compile(r"^[BF]{7}[LR]{3}$")
+@functools.lru_cache(maxsize=None)
+def bp_batch_regex(row_bits: int, column_bits: int) -> "re.Pattern[bytes]":
+    # Each pass must end at whitespace or the end of the buffer, so passes
+    # that run together are rejected rather than decoded as one number
+    return re.compile(rb"\s*(?:[BF]{%d}[LR]{%d}(?:\s+|\Z))*" % (row_bits, column_bits))
 
 
-def decode_boarding_pass(raw_bp_str: str) -> BoardingPass:
-    bp_str = raw_bp_str.strip()
+# Back and right take the upper half, so a pass is the seat ID written in binary
+_BP_STR_TO_BITS = str.maketrans("FBLR", "0101")
+_BP_BYTES_TO_BITS = bytes.maketrans(b"FBLR", b"0101")
+
 
-    assert BP_REGEX.match(bp_str), "Invalid boarding pass"
-    row_is_front_list = [row == "F" for row in raw_bp_str[:7]]
-    col_is_left_list = [col == "L" for col in raw_bp_str[7:]]
-    row = binary_search_from_top_codes(row_is_front_list, min_value=0, max_value=127)
-    col = binary_search_from_top_codes(col_is_left_list, min_value=0, max_value=7)
+def boarding_pass_from_seat_id(seat_id: int, *, column_bits: int = 3) -> BoardingPass:
     return BoardingPass(
-        row=row,
-        column=col,
-        seat_id=row * 8 + col,
+        row=seat_id >> column_bits,
+        column=seat_id & ((1 << column_bits) - 1),
+        seat_id=seat_id,
+    )
+
+
+def decode_seat_id(raw_bp_str: str) -> int:
+    bp_str = raw_bp_str.strip()
+    if not BP_REGEX.match(bp_str):
+        raise ValueError(f'Invalid boarding pass "{bp_str}"')
+    return int(bp_str.translate(_BP_STR_TO_BITS), 2)
+
+
+def decode_boarding_pass(raw_bp_str: str) -> BoardingPass:
+    return boarding_pass_from_seat_id(decode_seat_id(raw_bp_str))
+
+
+def seat_id_typecode(num_bits: int) -> str:
+    """Smallest unsigned array typecode holding num_bits-bit seat IDs"""
+    for typecode in ("B", "H", "I", "L", "Q"):
+        if num_bits <= array(typecode).itemsize * 8:
+            return typecode
+    raise ValueError(f"Seat IDs of {num_bits} bits do not fit in an array")
+
+
+def decode_seat_ids(
+    buffer: Union[bytes, str], *, row_bits: int = 7, column_bits: int = 3
+) -> array:
+    """Decodes whitespace-separated boarding passes into an array of seat IDs
+    without building a BoardingPass per pass. The typecode is the smallest
+    one that fits row_bits + column_bits bits."""
+    if isinstance(buffer, str):
+        buffer = buffer.encode("ascii")
+    if not bp_batch_regex(row_bits, column_bits).fullmatch(buffer):
+        raise ValueError("Invalid boarding pass in buffer")
+    return array(
+        seat_id_typecode(row_bits + column_bits),
+        [int(bits, 2) for bits in buffer.translate(_BP_BYTES_TO_BITS).split()],
     )
 
 
@@ -54,29 +75,112 @@ def iter_boarding_passes(file_obj: io.TextIOBase) -> Iterable[BoardingPass]:
 
 
 def find_highest_boarding_pass(file_obj: io.TextIOBase) -> BoardingPass:
-    best_boarding_pass: Optional[BoardingPass] = None
-    for boarding_pass in iter_boarding_passes(file_obj):
-        if (
-            best_boarding_pass is None
-            or boarding_pass.seat_id > best_boarding_pass.seat_id
-        ):
-            best_boarding_pass = boarding_pass
-    if best_boarding_pass is None:
+    seat_ids = decode_seat_ids(file_obj.read())
+    if not seat_ids:
         raise ValueError("No boarding pass found")
-    return best_boarding_pass
-
-
-def iter_missing_middle_seat_ids(file_obj: io.TextIOBase) -> BoardingPass:
-    seen_seat_ids = set(bp.seat_id for bp in iter_boarding_passes(file_obj))
-    for row in range(128):
-        for col in range(8):
-            seat_id = row * 8 + col
-            if (
-                seat_id not in seen_seat_ids
-                and seat_id + 1 in seen_seat_ids
-                and seat_id - 1 in seen_seat_ids
-            ):
-                yield seat_id
+    return boarding_pass_from_seat_id(max(seat_ids))
+
+
+_NONZERO_BYTE_REGEX = re.compile(rb"[^\x00]")
+
+
+def iter_set_bits(value: int) -> Iterator[int]:
+    """Yields the positions of the set bits of a non-negative int in order"""
+    data = value.to_bytes((value.bit_length() + 7) // 8, "little")
+    # The regex skips runs of empty bytes without a Python-level loop
+    for match in _NONZERO_BYTE_REGEX.finditer(data):
+        byte_index = match.start()
+        byte = data[byte_index]
+        while byte:
+            low_bit = byte & -byte
+            yield byte_index * 8 + low_bit.bit_length() - 1
+            byte ^= low_bit
+
+
+class SeatMap:
+    """Seat occupancy stored as one int bitmap, with bit seat_id set when the
+    seat is taken.
+
+    Queries combine whole-bitmap shifts and masks, so they cost time in
+    proportion to machine words rather than seats. Seat IDs follow the
+    boarding pass encoding: seat_id = row * columns + column.
+    """
+
+    def __init__(self, occupied: int, *, rows: int = 128, columns: int = 8) -> None:
+        self.occupied = occupied
+        self.rows = rows
+        self.columns = columns
+        self.num_seats = rows * columns
+        if occupied >> self.num_seats:
+            raise ValueError(f"Seat IDs must be below {self.num_seats}")
+        self._all_seats = (1 << self.num_seats) - 1
+        # Bit 0 of every row: the geometric series sum of 1 << (row * columns)
+        self._row_starts = self._all_seats // ((1 << columns) - 1)
+
+    @classmethod
+    def from_seat_ids(
+        cls, seat_ids: Iterable[int], *, rows: int = 128, columns: int = 8
+    ) -> "SeatMap":
+        num_seats = rows * columns
+        bitmap = bytearray((num_seats + 7) // 8)
+        for seat_id in seat_ids:
+            if not 0 <= seat_id < num_seats:
+                raise ValueError(f"Seat ID {seat_id} is outside the plane")
+            bitmap[seat_id >> 3] |= 1 << (seat_id & 7)
+        return cls(int.from_bytes(bitmap, "little"), rows=rows, columns=columns)
+
+    @property
+    def free(self) -> int:
+        return ~self.occupied & self._all_seats
+
+    def is_occupied(self, seat_id: int) -> bool:
+        return bool(self.occupied >> seat_id & 1)
+
+    def highest_seat_id(self) -> Optional[int]:
+        return self.occupied.bit_length() - 1 if self.occupied else None
+
+    def iter_missing_middle_seat_ids(self) -> Iterator[int]:
+        """Free seats whose neighbouring seat IDs are both occupied"""
+        occupied = self.occupied
+        return iter_set_bits(self.free & (occupied << 1) & (occupied >> 1))
+
+    def free_runs(
+        self, min_length: int = 1, *, within_rows: bool = True
+    ) -> List[Tuple[int, int]]:
+        """(first seat ID, length) of each maximal run of at least min_length
+        free seats. Runs are cut at row boundaries unless within_rows is False."""
+        free = self.free
+        starts = free & ~(free << 1)
+        ends = free & ~(free >> 1)
+        if within_rows:
+            row_starts = self._row_starts
+            row_ends = row_starts << (self.columns - 1)
+            starts |= free & row_starts
+            ends |= free & row_ends
+        return [
+            (start, end - start + 1)
+            for start, end in zip(iter_set_bits(starts), iter_set_bits(ends))
+            if end - start + 1 >= min_length
+        ]
+
+    def row_occupancy(self) -> List[int]:
+        """Number of occupied seats in each row"""
+        columns = self.columns
+        row_mask = (1 << columns) - 1
+        data = self.occupied.to_bytes((self.num_seats + 7) // 8, "little")
+        counts = []
+        # Each row only converts the few bytes it spans, so the whole pass is
+        # linear in the size of the bitmap rather than in occupied seats
+        for first_bit in range(0, self.num_seats, columns):
+            row_bytes = data[first_bit >> 3 : (first_bit + columns + 7) >> 3]
+            row = int.from_bytes(row_bytes, "little") >> (first_bit & 7)
+            counts.append(bin(row & row_mask).count("1"))
+        return counts
+
+
+def iter_missing_middle_seat_ids(file_obj: io.TextIOBase) -> Iterator[int]:
+    seat_map = SeatMap.from_seat_ids(decode_seat_ids(file_obj.read()))
+    return seat_map.iter_missing_middle_seat_ids()
 
 
 def main():
@@ -1,5 +1,10 @@
 import io
-from typing import Iterator, List
+import itertools
+import mmap
+import os
+import string
+import sys
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
 
 SAMPLE_INPUTS_STR = """
 abc
@@ -38,34 +43,145 @@ def gen_group_answers(file_obj: io.TextIOBase) -> Iterator[List[str]]:
         yield next_answers
 
 
+ALL_ANSWERS_MASK = (1 << 26) - 1
+
+_ANSWER_BITS: Dict[str, int] = {
+    char: 1 << index for index, char in enumerate(string.ascii_lowercase)
+}
+
+
+def answer_to_mask(answer: str) -> int:
+    """Encodes one person's answers as a 26-bit mask, bit 0 being "a" """
+    mask = 0
+    for char in answer:
+        try:
+            mask |= _ANSWER_BITS[char]
+        except KeyError:
+            raise ValueError(f"Unknown answer {char}") from None
+    return mask
+
+
+def gen_group_masks(lines: Iterable[str]) -> Iterator[Tuple[int, int]]:
+    """Yields the (union, intersection) answer masks of each group"""
+    union = 0
+    intersection = ALL_ANSWERS_MASK
+    in_group = False
+    for line_raw in lines:
+        line = line_raw.strip()
+        if line:
+            mask = answer_to_mask(line)
+            union |= mask
+            intersection &= mask
+            in_group = True
+        elif in_group:
+            yield union, intersection
+            union = 0
+            intersection = ALL_ANSWERS_MASK
+            in_group = False
+    if in_group:
+        yield union, intersection
+
+
+# Newlines end a person's answers, other whitespace is skipped and anything
+# else outside a-z sets a flag bit
+_NEWLINE = ord("\n")
+_INVALID_ANSWER_BIT = 1 << 26
+_BYTE_ANSWER_BITS = tuple(
+    (
+        1 << (byte - ord("a"))
+        if ord("a") <= byte <= ord("z")
+        else 0 if bytes([byte]).isspace() else _INVALID_ANSWER_BIT
+    )
+    for byte in range(256)
+)
+
+
+def gen_group_masks_from_buffer(
+    buffer: Union[bytes, mmap.mmap],
+) -> Iterator[Tuple[int, int]]:
+    """Yields the (union, intersection) answer masks of each group straight
+    from raw bytes.
+
+    The buffer is scanned once through a memoryview, so nothing is decoded,
+    sliced or collected into lists. A group ends at b"\n\n" or at any
+    whitespace-only line (e.g. from CRLF files).
+    """
+    answer_bits = _BYTE_ANSWER_BITS
+    union = 0
+    intersection = ALL_ANSWERS_MASK
+    in_group = False
+    mask = 0
+    with memoryview(buffer) as view:
+        # The extra newline closes a final line without one
+        for byte in itertools.chain(view, (_NEWLINE,)):
+            if byte != _NEWLINE:
+                mask |= answer_bits[byte]
+            elif mask:
+                union |= mask
+                intersection &= mask
+                in_group = True
+                mask = 0
+            elif in_group:
+                if union & _INVALID_ANSWER_BIT:
+                    raise ValueError("Unknown answer in group")
+                yield union, intersection
+                union = 0
+                intersection = ALL_ANSWERS_MASK
+                in_group = False
+    if in_group:
+        if union & _INVALID_ANSWER_BIT:
+            raise ValueError("Unknown answer in group")
+        yield union, intersection
+
+
+def sum_group_masks(group_masks: Iterable[Tuple[int, int]]) -> Tuple[int, int]:
+    union_total = 0
+    intersection_total = 0
+    for union, intersection in group_masks:
+        union_total += union.bit_count()
+        intersection_total += intersection.bit_count()
+    return union_total, intersection_total
+
+
+def solve_both_parts(lines: Iterable[str]) -> Tuple[int, int]:
+    """Sums per-group union and intersection sizes in one streaming pass"""
+    return sum_group_masks(gen_group_masks(lines))
+
+
+def solve_both_parts_mapped(path: str) -> Tuple[int, int]:
+    """Like solve_both_parts, but reads the file through mmap without decoding"""
+    with open(path, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0, 0
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return sum_group_masks(gen_group_masks_from_buffer(mapped))
+
+
 def solve_part_1(file_obj: io.TextIOBase) -> int:
-    total = 0
-    for group_answers in gen_group_answers(file_obj):
-        unique_answers = set(char for answer in group_answers for char in answer)
-        total += len(unique_answers)
-    return total
+    return solve_both_parts(file_obj)[0]
+
 
 def solve_part_2(file_obj: io.TextIOBase) -> int:
-    total = 0
-    for group_answers in gen_group_answers(file_obj):
-        first_answer = group_answers[0]
-        consensus = set(first_answer)
-        for answer in group_answers[1:]:
-            consensus = consensus & set(answer)
-        total += len(consensus)
-    return total
+    return solve_both_parts(file_obj)[1]
+
 
 def main():
+    sample_part_1, sample_part_2 = solve_both_parts(get_sample_inputs())
+    # python main.py --mmap [path]
+    if sys.argv[1:2] == ["--mmap"]:
+        path = sys.argv[2] if len(sys.argv) > 2 else "./input.txt"
+        actual_part_1, actual_part_2 = solve_both_parts_mapped(path)
+    else:
+        with open("./input.txt") as f:
+            actual_part_1, actual_part_2 = solve_both_parts(f)
     print("---Sample Part 1---")
-    print(f"Answer: {solve_part_1(get_sample_inputs())}")
+    print(f"Answer: {sample_part_1}")
     print("---Actual Part 1---")
-    with open("./input.txt") as f:
-        print(f"Answer: {solve_part_1(f)}")
+    print(f"Answer: {actual_part_1}")
     print("---Sample Part 2---")
-    print(f"Answer: {solve_part_2(get_sample_inputs())}")
+    print(f"Answer: {sample_part_2}")
     print("---Actual Part 2---")
-    with open("./input.txt") as f:
-        print(f"Answer: {solve_part_2(f)}")
+    print(f"Answer: {actual_part_2}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,64 @@
+"""Compares the single-scan rule parser with the per-item regex parser.
+
+Run from this directory: python bench.py [num_lines]
+"""
+import random
+import string
+import sys
+import time
+
+from main import bag_spec_iter, construct_bag_dict, construct_bag_rules
+
+DEFAULT_NUM_LINES = 1_000_000
+
+
+def bag_name(index: int) -> str:
+    letters = []
+    for _ in range(6):
+        index, remainder = divmod(index, 26)
+        letters.append(string.ascii_lowercase[remainder])
+    return f"{''.join(letters[:3])} {''.join(letters[3:])}"
+
+
+def make_rule_lines(num_lines: int) -> list:
+    rng = random.Random(2020)
+    lines = []
+    for index in range(num_lines):
+        num_items = min(rng.randrange(5), num_lines - index - 1)
+        if num_items == 0:
+            lines.append(f"{bag_name(index)} bags contain no other bags.\n")
+            continue
+        items = []
+        for child in rng.sample(range(index + 1, num_lines), num_items):
+            count = rng.randrange(1, 10)
+            items.append(f"{count} {bag_name(child)} bag{'s' if count > 1 else ''}")
+        lines.append(f"{bag_name(index)} bags contain {', '.join(items)}.\n")
+    return lines
+
+
+def main() -> None:
+    num_lines = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_NUM_LINES
+    lines = make_rule_lines(num_lines)
+
+    start = time.perf_counter()
+    old_bag_dict = {name: bag_spec for name, bag_spec in bag_spec_iter(lines)}
+    old_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    new_bag_dict = construct_bag_dict(lines)
+    new_seconds = time.perf_counter() - start
+    assert new_bag_dict == old_bag_dict
+
+    start = time.perf_counter()
+    bag_rules = construct_bag_rules(lines)
+    rules_seconds = time.perf_counter() - start
+    assert bag_rules == old_bag_dict
+
+    print(f"{num_lines} rule lines")
+    print(f"parse_line per item (old construct_bag_dict): {old_seconds:.3f}s")
+    print(f"construct_bag_dict (BagSpec items):           {new_seconds:.3f}s")
+    print(f"construct_bag_rules (tuple items):            {rules_seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
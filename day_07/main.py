@@ -1,6 +1,19 @@
+import collections
 import io
 import re
-from typing import Dict, List, Iterator, NamedTuple, Set, Tuple
+from array import array
+from typing import (
+    Dict,
+    FrozenSet,
+    Iterable,
+    List,
+    Iterator,
+    Mapping,
+    NamedTuple,
+    Sequence,
+    Set,
+    Tuple,
+)
 
 _SAMPLE_INPUT_STR = """
 light red bags contain 1 bright white bag, 2 muted yellow bags.
@@ -72,69 +85,205 @@ def bag_spec_iter(file_obj: io.TextIOBase) -> Iterator[Tuple[str, List[BagSpec]]
             yield parse_line(line)
 
 
+# One item plus its separator; a comma must be followed by another item and
+# the last item may only be followed by periods, so back-to-back matches
+# cover the whole item list
+BAG_ITEM_REGEX = re.compile(
+    r"([1-9][0-9]*) ([A-Za-z][A-Za-z ]*?) bags?(?:,\s*(?=[1-9])|\.*$)"
+)
+
+
+def iter_bag_rules(
+    lines: Iterable[str],
+) -> Iterator[Tuple[str, List[Tuple[int, str]]]]:
+    """Parses each rule line into (name, [(count, name), ...]) with one
+    partition and one regex scan.
+
+    Bag names are interned as they are seen, so every mention of a bag
+    shares one string. Items are plain tuples that unpack like BagSpec.
+    """
+    interned: Dict[str, str] = {}
+    intern = interned.setdefault
+    iter_items = BAG_ITEM_REGEX.finditer
+    for line_raw in lines:
+        line = line_raw.strip()
+        if not line:
+            continue
+        name, separator, contents = line.partition(" bags contain ")
+        if not separator:
+            raise ValueError(f'No "bags contain" clause in "{line}"')
+        if contents.rstrip(".") == "no other bags":
+            yield intern(name, name), []
+            continue
+        items = []
+        position = 0
+        for match in iter_items(contents):
+            if match.start() != position:
+                break
+            count, item_name = match.groups()
+            items.append((int(count), intern(item_name, item_name)))
+            position = match.end()
+        if not items or position != len(contents):
+            raise ValueError(f'Error parsing bag contents for "{line}"')
+        yield intern(name, name), items
+
+
 def construct_bag_dict(file_obj: io.TextIOBase) -> Dict[str, List[BagSpec]]:
-    return {name: bag_spec for name, bag_spec in bag_spec_iter(file_obj)}
-
-
-def search_bag_part1(
-    bag_name: str,
-    bag_dict: Dict[str, List[BagSpec]],
-    seen: Set[str],
-    contains_desired_bag: Set[str],
-    desired_bag_name: str,
-) -> None:
-    # Don't repeat a previous search
-    if bag_name in seen:
-        return
-    # Bags don't contain themselves
-    if bag_name == desired_bag_name:
-        seen.add(bag_name)
-        return
-    contents = bag_dict[bag_name]
-    for bag_spec in contents:
-        # Handle if bag has already been seen
-        # Handle fresh search
-        if bag_spec.name not in seen:
-            search_bag_part1(
-                bag_spec.name, bag_dict, seen, contains_desired_bag, desired_bag_name
+    return {
+        name: [BagSpec._make(item) for item in items]
+        for name, items in iter_bag_rules(file_obj)
+    }
+
+
+def construct_bag_rules(file_obj: io.TextIOBase) -> Dict[str, List[Tuple[int, str]]]:
+    return dict(iter_bag_rules(file_obj))
+
+
+class BagGraph:
+    """Bag rules with a reverse "contained-by" index for ancestor queries.
+
+    Ancestor sets are memoised and shared across queries: a search that
+    reaches a bag whose ancestors are already known reuses them instead of
+    walking further.
+    """
+
+    def __init__(self, bag_dict: Mapping[str, Sequence[Tuple[int, str]]]) -> None:
+        self.bag_dict = bag_dict
+        self.contained_by: Dict[str, Set[str]] = {}
+        for name, bag_specs in bag_dict.items():
+            for _, item_name in bag_specs:
+                self.contained_by.setdefault(item_name, set()).add(name)
+        self._ancestors: Dict[str, FrozenSet[str]] = {}
+
+    @classmethod
+    def from_file(cls, file_obj: io.TextIOBase) -> "BagGraph":
+        return cls(construct_bag_rules(file_obj))
+
+    def ancestors(self, bag_name: str) -> FrozenSet[str]:
+        """Every bag that can eventually contain bag_name"""
+        cached = self._ancestors.get(bag_name)
+        if cached is not None:
+            return cached
+        found: Set[str] = set()
+        queue = collections.deque(self.contained_by.get(bag_name, ()))
+        while queue:
+            container = queue.popleft()
+            if container in found:
+                continue
+            found.add(container)
+            known = self._ancestors.get(container)
+            if known is not None:
+                found |= known
+            else:
+                queue.extend(self.contained_by.get(container, ()))
+        # Bags don't contain themselves, even through a cycle
+        found.discard(bag_name)
+        result = frozenset(found)
+        self._ancestors[bag_name] = result
+        return result
+
+    def batch_ancestors(self, bag_names: Iterable[str]) -> Dict[str, FrozenSet[str]]:
+        return {bag_name: self.ancestors(bag_name) for bag_name in bag_names}
+
+
+def solve_part1(file_obj: io.TextIOBase, bag_name: str = "shiny gold") -> Set[str]:
+    return set(BagGraph.from_file(file_obj).ancestors(bag_name))
+
+
+class CompiledBagGraph:
+    """Bag rules with names interned to integer IDs and edges in flat arrays.
+
+    Edges out of bag i are edge_targets/edge_counts[edge_starts[i]:
+    edge_starts[i + 1]]. Nested totals for every bag are computed up front in
+    one reverse-topological pass, and kept as Python ints so they never
+    overflow.
+    """
+
+    def __init__(self, bag_dict: Mapping[str, Sequence[Tuple[int, str]]]) -> None:
+        self.names: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for name, bag_specs in bag_dict.items():
+            self.intern(name)
+            for _, item_name in bag_specs:
+                self.intern(item_name)
+        self.edge_starts = array("Q", [0])
+        self.edge_targets = array("Q")
+        self.edge_counts = array("Q")
+        for bag_id, name in enumerate(self.names):
+            for count, item_name in bag_dict.get(name, ()):
+                self.edge_targets.append(self.ids[item_name])
+                self.edge_counts.append(count)
+            self.edge_starts.append(len(self.edge_targets))
+        self.totals = self._compute_totals()
+
+    def intern(self, name: str) -> int:
+        bag_id = self.ids.get(name)
+        if bag_id is None:
+            bag_id = len(self.names)
+            self.ids[name] = bag_id
+            self.names.append(name)
+        return bag_id
+
+    def _compute_totals(self) -> List[int]:
+        num_bags = len(self.names)
+        edge_starts = self.edge_starts
+        edge_targets = self.edge_targets
+        edge_counts = self.edge_counts
+        containers: List[List[int]] = [[] for _ in range(num_bags)]
+        remaining = [0] * num_bags
+        for bag_id in range(num_bags):
+            remaining[bag_id] = edge_starts[bag_id + 1] - edge_starts[bag_id]
+            for edge in range(edge_starts[bag_id], edge_starts[bag_id + 1]):
+                containers[edge_targets[edge]].append(bag_id)
+        # Bags are resolved once everything they hold has been
+        ready = collections.deque(
+            bag_id for bag_id in range(num_bags) if remaining[bag_id] == 0
+        )
+        totals = [0] * num_bags
+        num_resolved = 0
+        while ready:
+            bag_id = ready.popleft()
+            num_resolved += 1
+            total = 0
+            for edge in range(edge_starts[bag_id], edge_starts[bag_id + 1]):
+                total += edge_counts[edge] * (totals[edge_targets[edge]] + 1)
+            totals[bag_id] = total
+            for container_id in containers[bag_id]:
+                remaining[container_id] -= 1
+                if remaining[container_id] == 0:
+                    ready.append(container_id)
+        if num_resolved < num_bags:
+            cycle = self._find_cycle(remaining)
+            raise ValueError(
+                "Bag rules contain a cycle: "
+                + " -> ".join(self.names[bag_id] for bag_id in cycle)
+            )
+        return totals
+
+    def _find_cycle(self, remaining: List[int]) -> List[int]:
+        # Every unresolved bag holds at least one unresolved bag, so following
+        # those edges must eventually revisit a bag
+        bag_id = next(i for i, count in enumerate(remaining) if count > 0)
+        path: List[int] = []
+        position: Dict[int, int] = {}
+        while bag_id not in position:
+            position[bag_id] = len(path)
+            path.append(bag_id)
+            bag_id = next(
+                self.edge_targets[edge]
+                for edge in range(
+                    self.edge_starts[bag_id], self.edge_starts[bag_id + 1]
+                )
+                if remaining[self.edge_targets[edge]] > 0
             )
-        if bag_spec.name == desired_bag_name or bag_spec.name in contains_desired_bag:
-            contains_desired_bag.add(bag_name)
-            break
-    seen.add(bag_name)
-
-
-def solve_part1(file_obj: io.TextIOBase) -> Set[str]:
-    seen: Set[str] = set()
-    contains_shiny_bag: Set[str] = set()
-    bag_dict = construct_bag_dict(file_obj)
-    for name in bag_dict:
-        search_bag_part1(name, bag_dict, seen, contains_shiny_bag, "shiny gold")
-    return contains_shiny_bag
-
-
-def count_bags_in_name(
-    bag_name: str,
-    bag_dict: Dict[str, List[BagSpec]],
-    saved_counts: Dict[str, int],
-) -> None:
-    if bag_name in saved_counts:
-        return
-    bag_specs = bag_dict[bag_name]
-    total = 0
-    for bag_spec in bag_specs:
-        if bag_spec.name not in saved_counts:
-            count_bags_in_name(bag_spec.name, bag_dict, saved_counts)
-        count_in_bag = saved_counts[bag_spec.name]
-        total += bag_spec.count * (count_in_bag + 1)
-    saved_counts[bag_name] = total
-
-
-def solve_part2(file_obj: io.TextIOBase) -> int:
-    saved_counts: Dict[str, int] = {}
-    bag_dict = construct_bag_dict(file_obj)
-    count_bags_in_name("shiny gold", bag_dict, saved_counts)
-    return saved_counts["shiny gold"]
+        return path[position[bag_id] :] + [bag_id]
+
+    def total_bags_in(self, bag_name: str) -> int:
+        return self.totals[self.ids[bag_name]]
+
+
+def solve_part2(file_obj: io.TextIOBase, bag_name: str = "shiny gold") -> int:
+    return CompiledBagGraph(construct_bag_rules(file_obj)).total_bags_in(bag_name)
 
 
 def main():
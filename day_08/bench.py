@@ -0,0 +1,71 @@
+"""Compares the Operation-list interpreter with CompiledProgram.
+
+Run from this directory: python bench.py [size ...]
+The Operation-list runs are skipped above LEGACY_MAX_SIZE, where building
+millions of NamedTuples dominates memory.
+"""
+import random
+import sys
+import time
+from array import array
+
+from main import (
+    ACC,
+    JMP,
+    NOP,
+    CompiledProgram,
+    Operation,
+    OPERATOR_BY_OPCODE,
+    accumulate_until_repeat,
+)
+
+DEFAULT_SIZES = [100_000, 1_000_000, 10_000_000]
+LEGACY_MAX_SIZE = 1_000_000
+
+
+def make_program(size: int) -> CompiledProgram:
+    """Mostly straight-line code with short forward jumps, ending in a jump
+    back to the start so the whole program runs once before repeating"""
+    rng = random.Random(2020)
+    opcodes = array("b")
+    operands = array("i")
+    index = 0
+    while index < size - 1:
+        choice = rng.random()
+        if choice < 0.1 and index + 2 < size - 1:
+            # jmp +2 over a filler nop
+            opcodes.extend((JMP, NOP))
+            operands.extend((2, 0))
+            index += 2
+        else:
+            opcodes.append(ACC if choice < 0.7 else NOP)
+            operands.append(rng.randrange(-50, 50))
+            index += 1
+    opcodes.append(JMP)
+    operands.append(-(size - 1))
+    return CompiledProgram(opcodes, operands)
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    for size in sizes:
+        program = make_program(size)
+        print(f"---{size} instructions---")
+        if size <= LEGACY_MAX_SIZE:
+            operations = [
+                Operation(OPERATOR_BY_OPCODE[opcode], operand)
+                for opcode, operand in zip(program.opcodes, program.operands)
+            ]
+            start = time.perf_counter()
+            legacy_acc = accumulate_until_repeat(operations)
+            print(f"accumulate_until_repeat: {time.perf_counter() - start:.3f}s")
+        else:
+            legacy_acc = None
+        start = time.perf_counter()
+        _, acc = program.run()
+        print(f"CompiledProgram.run:     {time.perf_counter() - start:.3f}s")
+        assert legacy_acc is None or legacy_acc == acc
+
+
+if __name__ == "__main__":
+    main()
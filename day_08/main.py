@@ -1,6 +1,25 @@
+import concurrent.futures
+import heapq
 import io
 import enum
-from typing import Final, NamedTuple, Set, List, Optional
+import multiprocessing
+import multiprocessing.synchronize
+import os
+import time
+from array import array
+from multiprocessing import shared_memory
+from typing import (
+    Final,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Set,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 _SAMPLE_INPUT_STR = """
 nop +0
@@ -30,27 +49,178 @@ class Operation(NamedTuple):
     value: int
 
 
-def parse_line(line: str) -> Operation:
-    line_split = line.split(" ")
-    assert len(line_split) == 2
-    [op_str_raw, val_str] = line_split
-    op_str = op_str_raw.strip()
-    operator: Operator
-    if op_str == "nop":
-        operator = Operator.nop
-    elif op_str == "acc":
-        operator = Operator.acc
-    if op_str == "jmp":
-        operator = Operator.jmp
-    return Operation(
-        operator=operator,
-        value=int(val_str),
-    )
+# Compiled opcodes; jmp is checked first in the dispatch loop
+NOP: Final = 0
+ACC: Final = 1
+JMP: Final = 2
+
+OPCODE_BY_OPERATOR: Final = {Operator.nop: NOP, Operator.acc: ACC, Operator.jmp: JMP}
+OPERATOR_BY_OPCODE: Final = {
+    opcode: operator for operator, opcode in OPCODE_BY_OPERATOR.items()
+}
+OPCODE_BY_NAME: Final = {
+    operator.name: opcode for operator, opcode in OPCODE_BY_OPERATOR.items()
+}
+
+
+class Loop(NamedTuple):
+    entry_index: int
+    cycle_length: int
+
+
+class ExecutionTrace(NamedTuple):
+    """What one traced run did, instruction by instruction"""
+
+    terminated: bool
+    acc: int
+    steps: int
+    seconds: float
+    hit_counts: array
+    loop: Optional[Loop]
+    jumps_taken: int
+    backward_jumps: int
+    nops_passed: int
+
+    @property
+    def instructions_per_second(self) -> float:
+        return self.steps / self.seconds if self.seconds else 0.0
+
+    def hot_instructions(self, count: int = 10) -> List[Tuple[int, int]]:
+        """(index, hits) of the most executed instructions"""
+        return heapq.nlargest(
+            count,
+            ((index, hits) for index, hits in enumerate(self.hit_counts) if hits),
+            key=lambda entry: entry[1],
+        )
+
+
+class CompiledProgram:
+    """Program pre-decoded into flat arrays: opcodes in array("b") and
+    operands in array("i")"""
+
+    def __init__(self, opcodes: array, operands: array) -> None:
+        if len(opcodes) != len(operands):
+            raise ValueError("Every opcode needs exactly one operand")
+        self.opcodes = opcodes
+        self.operands = operands
+
+    @classmethod
+    def from_operations(cls, program: Iterable[Operation]) -> "CompiledProgram":
+        opcodes = array("b")
+        operands = array("i")
+        for operation in program:
+            opcodes.append(OPCODE_BY_OPERATOR[operation.operator])
+            operands.append(operation.value)
+        return cls(opcodes, operands)
 
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "CompiledProgram":
+        opcodes = array("b")
+        operands = array("i")
+        for line in lines:
+            fields = line.split()
+            if not fields:
+                continue
+            if len(fields) != 2 or fields[0] not in OPCODE_BY_NAME:
+                raise ValueError(f'Unknown instruction "{line.strip()}"')
+            opcodes.append(OPCODE_BY_NAME[fields[0]])
+            operands.append(int(fields[1]))
+        return cls(opcodes, operands)
 
-def parse_program(input_file: io.TextIOBase) -> List[Operation]:
-    stripped_lines = (line.strip() for line in input_file)
-    return [parse_line(line) for line in stripped_lines if line]
+    def __len__(self) -> int:
+        return len(self.opcodes)
+
+    def __getitem__(self, index: int) -> Operation:
+        return Operation(OPERATOR_BY_OPCODE[self.opcodes[index]], self.operands[index])
+
+    def run(self, flip_index: Optional[int] = None) -> Tuple[bool, int]:
+        """Runs until the program leaves its bounds or repeats an instruction,
+        optionally with one jmp/nop flipped. Returns (terminated, acc)."""
+        opcodes = self.opcodes
+        if flip_index is not None:
+            opcodes = array("b", opcodes)
+            opcode = opcodes[flip_index]
+            if opcode != JMP and opcode != NOP:
+                raise ValueError(f"Instruction {flip_index} is not a jmp or nop")
+            opcodes[flip_index] = NOP if opcode == JMP else JMP
+        operands = self.operands
+        length = len(opcodes)
+        visited = bytearray(length)
+        acc = 0
+        index = 0
+        while 0 <= index < length:
+            if visited[index]:
+                return False, acc
+            visited[index] = 1
+            opcode = opcodes[index]
+            if opcode == JMP:
+                index += operands[index]
+            else:
+                if opcode == ACC:
+                    acc += operands[index]
+                elif opcode != NOP:
+                    raise ValueError(f"Unknown opcode {opcode} at {index}")
+                index += 1
+        return True, acc
+
+    def trace(self, *, max_steps: Optional[int] = None) -> ExecutionTrace:
+        """Instrumented counterpart of run(); run() itself carries no tracing.
+
+        By default execution stops at the first repeated instruction, like
+        run(). With max_steps it keeps going through the loop until it
+        terminates or executes max_steps instructions, so hit counts show
+        where a slow program spends its time.
+        """
+        opcodes = self.opcodes
+        operands = self.operands
+        length = len(opcodes)
+        hit_counts = array("Q", [0]) * length
+        # Step at which each instruction first ran, for the cycle length
+        first_step = [-1] * length
+        loop: Optional[Loop] = None
+        jumps_taken = 0
+        backward_jumps = 0
+        nops_passed = 0
+        acc = 0
+        index = 0
+        steps = 0
+        started = time.perf_counter()
+        while 0 <= index < length:
+            if loop is None and first_step[index] >= 0:
+                loop = Loop(entry_index=index, cycle_length=steps - first_step[index])
+                if max_steps is None:
+                    break
+            if max_steps is not None and steps >= max_steps:
+                break
+            if first_step[index] < 0:
+                first_step[index] = steps
+            hit_counts[index] += 1
+            steps += 1
+            opcode = opcodes[index]
+            if opcode == JMP:
+                jumps_taken += 1
+                if operands[index] <= 0:
+                    backward_jumps += 1
+                index += operands[index]
+            else:
+                if opcode == ACC:
+                    acc += operands[index]
+                elif opcode == NOP:
+                    nops_passed += 1
+                else:
+                    raise ValueError(f"Unknown opcode {opcode} at {index}")
+                index += 1
+        return ExecutionTrace(
+            terminated=not 0 <= index < length,
+            acc=acc,
+            steps=steps,
+            seconds=time.perf_counter() - started,
+            hit_counts=hit_counts,
+            loop=loop,
+            jumps_taken=jumps_taken,
+            backward_jumps=backward_jumps,
+            nops_passed=nops_passed,
+        )
 
 
 def accumulate_until_repeat(program: List[Operation]) -> int:
@@ -78,44 +248,216 @@ def accumulate_until_repeat(program: List[Operation]) -> int:
 
 
 def solve_part1(input_file: io.TextIOBase) -> None:
-    program = parse_program(input_file)
-    print(f"acc at value {accumulate_until_repeat(program)} until end or until repeat")
+    program = CompiledProgram.from_lines(input_file)
+    _, acc = program.run()
+    print(f"acc at value {acc} until end or until repeat")
+
+
+class Repair(NamedTuple):
+    flip_index: int
+    operator: Operator
+    acc: int
 
 
-def accumulate_and_remove_jmp(
-    program: List[Operation], jmp_to_nop_index: int
-) -> Optional[int]:
+def find_exit_paths(
+    program: Union[List[Operation], CompiledProgram],
+) -> Tuple[List[bool], List[int]]:
+    """For every instruction, whether the unmodified program runs off either
+    end from there, and if so how much it adds to acc on the way.
+
+    Each instruction has exactly one successor, so following successors
+    until a known instruction and then labelling the whole path visits every
+    instruction once.
+    """
+    if not isinstance(program, CompiledProgram):
+        program = CompiledProgram.from_operations(program)
+    opcodes = program.opcodes
+    operands = program.operands
+    length = len(opcodes)
+    successors = [
+        index + operand if opcode == JMP else index + 1
+        for index, (opcode, operand) in enumerate(zip(opcodes, operands))
+    ]
+    # 0: unseen, 1: on the current path, 2: exits, 3: loops forever
+    states = bytearray(length)
+    acc_to_exit = [0] * length
+    for start in range(length):
+        if states[start]:
+            continue
+        path = []
+        index = start
+        while 0 <= index < length and not states[index]:
+            states[index] = 1
+            path.append(index)
+            index = successors[index]
+        if not 0 <= index < length:
+            outcome, acc = 2, 0
+        elif states[index] == 2:
+            outcome, acc = 2, acc_to_exit[index]
+        else:
+            outcome, acc = 3, 0
+        for index in reversed(path):
+            states[index] = outcome
+            if outcome == 2:
+                if opcodes[index] == ACC:
+                    acc += operands[index]
+                acc_to_exit[index] = acc
+    return [state == 2 for state in states], acc_to_exit
+
+
+def find_repair(program: Union[List[Operation], CompiledProgram]) -> Optional[Repair]:
+    """Finds the first jmp/nop on the looping path whose flip lets the
+    program terminate, in O(n) overall.
+
+    Flipping an instruction the program never reaches changes nothing, so
+    only the original path needs checking. A flip works exactly when its new
+    target is an exit or an instruction already known to exit. Returns None
+    when no single flip helps or the program already terminates.
+    """
+    if not isinstance(program, CompiledProgram):
+        program = CompiledProgram.from_operations(program)
+    exits, acc_to_exit = find_exit_paths(program)
+    opcodes = program.opcodes
+    operands = program.operands
+    length = len(opcodes)
+    if not length or exits[0]:
+        return None
     acc = 0
     index = 0
-    min_index: Final = 0
-    max_index: Final = len(program) - 1
-    visited: Set[str] = set()
-    while index >= min_index and index <= max_index:
-        if index in visited:
-            acc = None
-            break
-        visited.add(index)
-        operation = program[index]
-        operator = operation.operator
-        if operator == Operator.nop or index == jmp_to_nop_index:
+    visited = bytearray(length)
+    while not visited[index]:
+        visited[index] = 1
+        opcode = opcodes[index]
+        if opcode == ACC:
+            acc += operands[index]
             index += 1
-        elif operator == Operator.acc:
-            index += 1
-            acc += operation.value
-        elif operator == Operator.jmp:
-            index += operation.value
+            continue
+        if opcode == JMP:
+            flipped, flipped_target = NOP, index + 1
+            index_after = index + operands[index]
         else:
-            raise ValueError("Unknown operator", operator)
-    return acc
+            flipped, flipped_target = JMP, index + operands[index]
+            index_after = index + 1
+        if not 0 <= flipped_target < length:
+            return Repair(index, OPERATOR_BY_OPCODE[flipped], acc)
+        if exits[flipped_target]:
+            return Repair(
+                index, OPERATOR_BY_OPCODE[flipped], acc + acc_to_exit[flipped_target]
+            )
+        index = index_after
+    return None
+
+
+def gen_flip_candidates(program: CompiledProgram) -> Iterator[Tuple[int, int]]:
+    """(index, new opcode) for every jmp/nop flip in the program"""
+    for index, opcode in enumerate(program.opcodes):
+        if opcode == JMP:
+            yield index, NOP
+        elif opcode == NOP:
+            yield index, JMP
+
+
+# Set in each pool worker by _init_mutation_worker. The shared memory handle
+# is kept so the mapping stays open for the life of the worker.
+_worker_shared: Optional[shared_memory.SharedMemory] = None
+_worker_program: Optional[Tuple[memoryview, memoryview]] = None
+_worker_found: Optional[multiprocessing.synchronize.Event] = None
+
+
+def _init_mutation_worker(
+    shared_name: str, length: int, found: multiprocessing.synchronize.Event
+) -> None:
+    global _worker_shared, _worker_program, _worker_found
+    shared = shared_memory.SharedMemory(name=shared_name)
+    _worker_shared = shared
+    operands = shared.buf[: 4 * length].cast("i")
+    opcodes = shared.buf[4 * length : 5 * length].cast("b")
+    _worker_program = (opcodes, operands)
+    _worker_found = found
+
+
+def _test_mutations(
+    candidates: Sequence[Tuple[int, int]],
+) -> Optional[Tuple[int, int, int]]:
+    assert _worker_program is not None and _worker_found is not None
+    shared_opcodes, operands = _worker_program
+    for mutated_index, mutated_opcode in candidates:
+        if _worker_found.is_set():
+            return None
+        opcodes = bytearray(shared_opcodes)
+        opcodes[mutated_index] = mutated_opcode
+        terminated, acc = CompiledProgram(opcodes, operands).run()
+        if terminated:
+            _worker_found.set()
+            return mutated_index, mutated_opcode, acc
+    return None
+
+
+def find_mutation_parallel(
+    program: CompiledProgram,
+    candidates: Optional[Iterable[Tuple[int, int]]] = None,
+    *,
+    processes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> Optional[Repair]:
+    """Brute-force search for a single-instruction mutation that makes the
+    program terminate, spread across a process pool.
+
+    candidates are (index, new opcode) pairs and default to every jmp/nop
+    flip; a ValueError is raised for any pair outside the program or with an
+    unknown opcode. The decoded program is copied into shared memory once and every
+    worker maps it instead of receiving a pickled copy per task. As soon as
+    any candidate terminates, the other workers stop at their next candidate
+    and queued chunks are cancelled. Which winner is reported is then down to
+    timing if several candidates work.
+    """
+    candidate_list = list(
+        gen_flip_candidates(program) if candidates is None else candidates
+    )
+    length = len(program)
+    for index, opcode in candidate_list:
+        if not 0 <= index < length:
+            raise ValueError(f"Mutation index {index} is outside the program")
+        if opcode not in OPERATOR_BY_OPCODE:
+            raise ValueError(f"Unknown opcode {opcode} in mutation at {index}")
+    if not candidate_list or not length:
+        return None
+    num_processes = processes or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, len(candidate_list) // (num_processes * 8))
+    shared = shared_memory.SharedMemory(create=True, size=5 * length)
+    try:
+        shared.buf[: 4 * length] = array("i", program.operands).tobytes()
+        shared.buf[4 * length : 5 * length] = array("b", program.opcodes).tobytes()
+        found = multiprocessing.Event()
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=num_processes,
+            initializer=_init_mutation_worker,
+            initargs=(shared.name, length, found),
+        ) as executor:
+            futures = [
+                executor.submit(
+                    _test_mutations, candidate_list[start : start + chunk_size]
+                )
+                for start in range(0, len(candidate_list), chunk_size)
+            ]
+            for future in concurrent.futures.as_completed(futures):
+                result = future.result()
+                if result is not None:
+                    for pending in futures:
+                        pending.cancel()
+                    index, opcode, acc = result
+                    return Repair(index, OPERATOR_BY_OPCODE[opcode], acc)
+        return None
+    finally:
+        shared.close()
+        shared.unlink()
 
 
 def solve_part2(input_file):
-    program = parse_program(input_file)
-    jmp_indexes = [i for i, operation in enumerate(program) if operation.operator == Operator.jmp]
-    for jmp_to_nop_index in jmp_indexes:
-        result = accumulate_and_remove_jmp(program, jmp_to_nop_index)
-        if result is not None:
-            print(f"acc: {result} for line {jmp_to_nop_index+1}")
+    program = CompiledProgram.from_lines(input_file)
+    repair = find_repair(program)
+    if repair is not None:
+        print(f"acc: {repair.acc} for line {repair.flip_index+1}")
 
 
 def main() -> None:
@@ -0,0 +1,83 @@
+"""Compares stepping the ship with folding the route into an AffineMap.
+
+Run from this directory: python bench.py [num_instructions ...]
+"""
+import io
+import random
+import sys
+import time
+
+from main import (
+    ShipState,
+    ShipStatePart2,
+    compile_instruction,
+    compile_route,
+    compile_route_parallel,
+    compose_maps,
+    process_mahhattan_distance,
+)
+
+DEFAULT_SIZES = [200_000, 1_000_000]
+
+
+def make_instructions(num_instructions: int) -> list:
+    rng = random.Random(2020)
+    instructions = []
+    for _ in range(num_instructions):
+        action = rng.choice("NSEWLRF")
+        if action in "LR":
+            instructions.append(f"{action}{rng.choice((90, 180, 270))}")
+        else:
+            instructions.append(f"{action}{rng.randrange(1, 100)}")
+    return instructions
+
+
+def make_ship(part: int) -> ShipState:
+    if part == 1:
+        return ShipState()
+    return ShipStatePart2(waypoint_x=10, waypoint_y=1)
+
+
+def main() -> None:
+    sizes = [int(arg) for arg in sys.argv[1:]] or DEFAULT_SIZES
+    for size in sizes:
+        instructions = make_instructions(size)
+        text = "\n".join(instructions)
+        for part in (1, 2):
+            moves_waypoint = part == 2
+            print(f"---{size} instructions, part {part}---")
+
+            start = time.perf_counter()
+            expected = process_mahhattan_distance(io.StringIO(text), make_ship(part))
+            print(f"process_mahhattan_distance: {time.perf_counter() - start:.3f}s")
+
+            start = time.perf_counter()
+            ship_state = make_ship(part)
+            ship_state.apply(compile_route(instructions, moves_waypoint=moves_waypoint))
+            print(f"compile_route:              {time.perf_counter() - start:.3f}s")
+            assert ship_state.manhattan_distance() == expected
+
+            start = time.perf_counter()
+            ship_state = make_ship(part)
+            ship_state.apply(
+                compose_maps(
+                    [
+                        compile_instruction(instruction, moves_waypoint=moves_waypoint)
+                        for instruction in instructions
+                    ]
+                )
+            )
+            print(f"compose_maps:               {time.perf_counter() - start:.3f}s")
+            assert ship_state.manhattan_distance() == expected
+
+            start = time.perf_counter()
+            ship_state = make_ship(part)
+            ship_state.apply(
+                compile_route_parallel(instructions, moves_waypoint=moves_waypoint)
+            )
+            print(f"compile_route_parallel:     {time.perf_counter() - start:.3f}s")
+            assert ship_state.manhattan_distance() == expected
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
+import concurrent.futures
+import functools
 import io
+import os
 
-# from typing import Optional
-import math
+from typing import Iterable, List, NamedTuple, Optional, Sequence, Tuple
 
 _SAMPLE_INPUT_STR = """
 F10
@@ -16,7 +18,24 @@ def get_sample_inputs():
     return io.StringIO(_SAMPLE_INPUT_STR)
 
 
-PRECISION = 5
+_ACTIONS = frozenset("NSEWLRF")
+
+
+def parse_instruction(instruction: str) -> Tuple[str, int]:
+    """Splits an instruction such as "F10" into its action and value"""
+    if len(instruction) <= 1:
+        raise ValueError("Instruction must be 2 or more characters")
+    action = instruction[0].upper()
+    if action not in _ACTIONS:
+        raise ValueError(f"Unknown action {action}")
+    return action, int(instruction[1:])
+
+
+def turn_degrees(degrees: int) -> int:
+    """Normalises a counter-clockwise turn to 0, 90, 180 or 270"""
+    if degrees % 90:
+        raise ValueError("Only multiples of 90 allowed as turns")
+    return degrees % 360
 
 
 class ShipState:
@@ -59,7 +78,7 @@ class ShipState:
         return f"({self.x}, {self.y}) Waypoint: ({self.waypoint_x}, {self.waypoint_y})"
 
     def turn(self, degrees_in: int) -> None:
-        degrees = degrees_in % 360
+        degrees = turn_degrees(degrees_in)
         if degrees == 90:
             old_x = self.waypoint_x
             self.waypoint_x = -self.waypoint_y
@@ -71,8 +90,6 @@ class ShipState:
             old_x = self.waypoint_x
             self.waypoint_x = self.waypoint_y
             self.waypoint_y = -old_x
-        elif degrees != 0:
-            raise ValueError('Only multiples of 90 allowed as turns')
         # radius = self.waypoint_radius
         # new_degrees = self.waypoint_degrees + degrees
 
@@ -87,10 +104,7 @@ class ShipState:
         self.x += distance
 
     def process_instruction(self, instruction: str) -> None:
-        if len(instruction) <= 1:
-            raise ValueError("Instruction must be 2 or more characters")
-        action = instruction[0].upper()
-        value = int(instruction[1:])
+        action, value = parse_instruction(instruction)
         if action == "N":
             self.move_y(value)
         elif action == "S":
@@ -103,14 +117,19 @@ class ShipState:
             self.turn(value)
         elif action == "R":
             self.turn(-value)
-        elif action == "F":
-            self.forward(value)
         else:
-            raise ValueError(f"Unknown action {action}")
+            self.forward(value)
         # print(f'instruction: {instruction}; {self}')
 
-    def manhattan_distance(self) -> float:
-        return math.fabs(self.x) + math.fabs(self.y)
+    def manhattan_distance(self) -> int:
+        return abs(self.x) + abs(self.y)
+
+    @property
+    def state(self) -> "ShipVector":
+        return (self.x, self.y, self.waypoint_x, self.waypoint_y)
+
+    def apply(self, route: "AffineMap") -> None:
+        self.x, self.y, self.waypoint_x, self.waypoint_y = route.apply(self.state)
 
 
 class ShipStatePart2(ShipState):
@@ -122,6 +141,195 @@ class ShipStatePart2(ShipState):
         self.waypoint_y += distance
 
 
+ShipVector = Tuple[int, int, int, int]
+Block = Tuple[int, int, int, int]
+Pair = Tuple[int, int]
+
+
+class AffineMap(NamedTuple):
+    """Integer affine map on (x, y, waypoint_x, waypoint_y).
+
+    The ship's position never feeds back into the waypoint or into how far the
+    ship moves, so every route has the block form
+
+        waypoint -> rotation @ waypoint + waypoint_offset
+        ship     -> ship + shear @ waypoint + ship_offset
+
+    with the 2x2 blocks stored row-major. Composing keeps that form and is
+    associative, so a route can be reduced in any grouping (a tree, or chunks
+    computed in parallel) and still give the exact same integers.
+    """
+
+    rotation: Block = (1, 0, 0, 1)
+    shear: Block = (0, 0, 0, 0)
+    ship_offset: Pair = (0, 0)
+    waypoint_offset: Pair = (0, 0)
+
+    def apply(self, vector: ShipVector) -> ShipVector:
+        x, y, wx, wy = vector
+        ra, rb, rc, rd = self.rotation
+        sa, sb, sc, sd = self.shear
+        tx, ty = self.ship_offset
+        ux, uy = self.waypoint_offset
+        return (
+            x + sa * wx + sb * wy + tx,
+            y + sc * wx + sd * wy + ty,
+            ra * wx + rb * wy + ux,
+            rc * wx + rd * wy + uy,
+        )
+
+    def then(self, other: "AffineMap") -> "AffineMap":
+        """The map that applies self first and other second"""
+        ra, rb, rc, rd = self.rotation
+        sa, sb, sc, sd = self.shear
+        tx, ty = self.ship_offset
+        ux, uy = self.waypoint_offset
+        oa, ob, oc, od = other.rotation
+        pa, pb, pc, pd = other.shear
+        otx, oty = other.ship_offset
+        oux, ouy = other.waypoint_offset
+        return AffineMap(
+            rotation=(
+                oa * ra + ob * rc,
+                oa * rb + ob * rd,
+                oc * ra + od * rc,
+                oc * rb + od * rd,
+            ),
+            shear=(
+                sa + pa * ra + pb * rc,
+                sb + pa * rb + pb * rd,
+                sc + pc * ra + pd * rc,
+                sd + pc * rb + pd * rd,
+            ),
+            ship_offset=(tx + pa * ux + pb * uy + otx, ty + pc * ux + pd * uy + oty),
+            waypoint_offset=(oa * ux + ob * uy + oux, oc * ux + od * uy + ouy),
+        )
+
+
+IDENTITY_MAP = AffineMap()
+
+# Counter-clockwise quarter turns of the waypoint
+_WAYPOINT_ROTATIONS = {
+    0: (1, 0, 0, 1),
+    90: (0, -1, 1, 0),
+    180: (-1, 0, 0, -1),
+    270: (0, 1, -1, 0),
+}
+
+_DIRECTIONS = {"N": (0, 1), "S": (0, -1), "E": (1, 0), "W": (-1, 0)}
+
+# Keyed on the parsed action so long routes share entries, and bounded since
+# forward distances are arbitrary
+_INSTRUCTION_CACHE_SIZE = 1024
+
+
+def compile_instruction(instruction: str, *, moves_waypoint: bool) -> AffineMap:
+    """moves_waypoint selects the part 2 rules, where N/S/E/W move the
+    waypoint instead of the ship"""
+    action, value = parse_instruction(instruction)
+    return _compile_action(action, value, moves_waypoint)
+
+
+@functools.lru_cache(maxsize=_INSTRUCTION_CACHE_SIZE)
+def _compile_action(action: str, value: int, moves_waypoint: bool) -> AffineMap:
+    if action in _DIRECTIONS:
+        dx, dy = _DIRECTIONS[action]
+        if moves_waypoint:
+            return AffineMap(waypoint_offset=(dx * value, dy * value))
+        return AffineMap(ship_offset=(dx * value, dy * value))
+    elif action == "L" or action == "R":
+        degrees = turn_degrees(value if action == "L" else -value)
+        return AffineMap(rotation=_WAYPOINT_ROTATIONS[degrees])
+    return AffineMap(shear=(value, 0, 0, value))
+
+
+def compose_maps(maps: Sequence[AffineMap]) -> AffineMap:
+    """Composes maps in order by pairwise tree reduction"""
+    level = list(maps)
+    if not level:
+        return IDENTITY_MAP
+    while len(level) > 1:
+        paired = [level[i].then(level[i + 1]) for i in range(0, len(level) - 1, 2)]
+        if len(level) % 2:
+            paired.append(level[-1])
+        level = paired
+    return level[0]
+
+
+def compile_route(instructions: Iterable[str], *, moves_waypoint: bool) -> AffineMap:
+    """Folds the route into one map, left to right.
+
+    Each instruction only touches a few entries of the blocks, so they are
+    updated in place as locals rather than by composing a full map per step.
+    """
+    ra, rb, rc, rd = IDENTITY_MAP.rotation
+    sa, sb, sc, sd = IDENTITY_MAP.shear
+    tx, ty = IDENTITY_MAP.ship_offset
+    ux, uy = IDENTITY_MAP.waypoint_offset
+    for instruction in instructions:
+        action, value = parse_instruction(instruction)
+        if action == "F":
+            sa += value * ra
+            sb += value * rb
+            sc += value * rc
+            sd += value * rd
+            tx += value * ux
+            ty += value * uy
+        elif action in _DIRECTIONS:
+            dx, dy = _DIRECTIONS[action]
+            if moves_waypoint:
+                ux += dx * value
+                uy += dy * value
+            else:
+                tx += dx * value
+                ty += dy * value
+        else:
+            degrees = turn_degrees(value if action == "L" else -value)
+            a, b, c, d = _WAYPOINT_ROTATIONS[degrees]
+            ra, rb, rc, rd = (
+                a * ra + b * rc,
+                a * rb + b * rd,
+                c * ra + d * rc,
+                c * rb + d * rd,
+            )
+            ux, uy = a * ux + b * uy, c * ux + d * uy
+    return AffineMap(
+        rotation=(ra, rb, rc, rd),
+        shear=(sa, sb, sc, sd),
+        ship_offset=(tx, ty),
+        waypoint_offset=(ux, uy),
+    )
+
+
+def compile_route_parallel(
+    instructions: Sequence[str],
+    *,
+    moves_waypoint: bool,
+    processes: Optional[int] = None,
+    chunk_size: Optional[int] = None,
+) -> AffineMap:
+    """Compiles contiguous chunks of the route in a process pool and composes
+    the chunk maps in order"""
+    num_processes = processes or os.cpu_count() or 1
+    chunk_size = chunk_size or max(1, -(-len(instructions) // num_processes))
+    chunks = [
+        instructions[start : start + chunk_size]
+        for start in range(0, len(instructions), chunk_size)
+    ]
+    with concurrent.futures.ProcessPoolExecutor(max_workers=num_processes) as executor:
+        chunk_maps = list(
+            executor.map(
+                functools.partial(compile_route, moves_waypoint=moves_waypoint), chunks
+            )
+        )
+    return compose_maps(chunk_maps)
+
+
+def read_instructions(inputs: io.TextIOBase) -> List[str]:
+    stripped_lines = (line.strip() for line in inputs)
+    return [instruction for instruction in stripped_lines if instruction]
+
+
 def process_mahhattan_distance(inputs: io.TextIOBase, ship_state: ShipState) -> int:
     stripped_lines = (line.strip() for line in inputs)
     instructions = (instruction for instruction in stripped_lines if instruction)
@@ -131,8 +339,7 @@ def process_mahhattan_distance(inputs: io.TextIOBase, ship_state: ShipState) ->
 
 
 def solve_part1(inputs: io.TextIOBase) -> int:
-    ship_state = ShipState()
-    return process_mahhattan_distance(inputs, ship_state)
+    return process_mahhattan_distance(inputs, ShipState())
 
 
 def solve_part2(inputs: io.TextIOBase) -> int: